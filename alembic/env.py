@@ -0,0 +1,39 @@
+from logging.config import fileConfig
+
+from alembic import context
+from dotenv import load_dotenv
+
+# Загружаем переменные окружения до импорта приложения (DATABASE_URL)
+load_dotenv()
+
+from app.database.database import engine, Base
+import app.models  # noqa: F401 - регистрирует модели в Base.metadata
+
+config = context.config
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def run_migrations_offline() -> None:
+    """Генерация SQL без подключения к БД (alembic upgrade --sql)"""
+    context.configure(
+        url=str(engine.url),
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    """Применение миграций через движок приложения"""
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+        with context.begin_transaction():
+            context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,194 @@
+"""initial schema
+
+Таблицы и индексы моделей app.models на момент перехода на Alembic.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-15
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+# metadata=: тип создается явно в upgrade, а не при создании каждой таблицы
+_metadata = sa.MetaData()
+workspace_role = sa.Enum(
+    "owner", "editor", "reader", name="workspace_role", create_constraint=True, metadata=_metadata
+)
+invite_status = sa.Enum(
+    "pending", "accepted", "declined", "expired", name="invite_status", create_constraint=True, metadata=_metadata
+)
+
+def upgrade() -> None:
+    # Типы enum в PostgreSQL создаются один раз (в SQLite - CHECK ограничения колонок)
+    bind = op.get_bind()
+    workspace_role.create(bind, checkfirst=True)
+    invite_status.create(bind, checkfirst=True)
+
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('hashed_password', sa.String(), nullable=False),
+    sa.Column('position', sa.String(), nullable=True),
+    sa.Column('avatar', sa.Text(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    op.create_table('messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('receiver_id', sa.Integer(), nullable=False),
+    sa.Column('is_read', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('read_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['receiver_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_messages_receiver_sender', 'messages', ['receiver_id', 'sender_id', 'created_at'], unique=False)
+    op.create_index('ix_messages_sender_receiver', 'messages', ['sender_id', 'receiver_id', 'created_at'], unique=False)
+    op.create_index('messages_unread_idx', 'messages', ['receiver_id'], unique=False, postgresql_where=sa.text('is_read IS false'), sqlite_where=sa.text('is_read IS false'))
+    op.create_table('workspaces',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('email_invites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('role', workspace_role, nullable=False),
+    sa.Column('status', invite_status, nullable=True),
+    sa.Column('token', sa.String(length=43), nullable=False),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('sent_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('accepted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_email_invites_email', 'email_invites', ['email'], unique=False)
+    op.create_index(op.f('ix_email_invites_token'), 'email_invites', ['token'], unique=True)
+    op.create_index('ix_email_invites_workspace', 'email_invites', ['workspace_id'], unique=False)
+    op.create_table('invites',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('token', sa.String(length=43), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('inviter_id', sa.Integer(), nullable=False),
+    sa.Column('invitee_id', sa.Integer(), nullable=True),
+    sa.Column('email', sa.String(), nullable=True),
+    sa.Column('role', workspace_role, nullable=False),
+    sa.Column('status', invite_status, nullable=True),
+    sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('accepted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['invitee_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['inviter_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_invites_token'), 'invites', ['token'], unique=True)
+    op.create_index('ix_invites_workspace', 'invites', ['workspace_id'], unique=False)
+    op.create_table('tasks',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('priority', sa.String(), nullable=True),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('creator_id', sa.Integer(), nullable=False),
+    sa.Column('due_date', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('completed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['creator_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_tasks_creator', 'tasks', ['creator_id'], unique=False)
+    op.create_index('ix_tasks_workspace_id', 'tasks', ['workspace_id', 'id'], unique=False)
+    op.create_table('workspace_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('role', workspace_role, nullable=False),
+    sa.Column('joined_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('workspace_id', 'user_id', name='uq_workspace_members_workspace_user')
+    )
+    op.create_index('ix_wm_user_ws', 'workspace_members', ['user_id', 'workspace_id'], unique=False)
+    op.create_table('workspace_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('sender_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.ForeignKeyConstraint(['sender_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_workspace_messages_workspace', 'workspace_messages', ['workspace_id', 'created_at'], unique=False)
+    op.create_table('comments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('content', sa.Text(), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('author_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_comments_task', 'comments', ['task_id', 'created_at'], unique=False)
+    op.create_table('task_assignees',
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('task_id', 'user_id')
+    )
+
+def downgrade() -> None:
+    op.drop_table('task_assignees')
+    op.drop_index('ix_comments_task', table_name='comments')
+    op.drop_table('comments')
+    op.drop_index('ix_workspace_messages_workspace', table_name='workspace_messages')
+    op.drop_table('workspace_messages')
+    op.drop_index('ix_wm_user_ws', table_name='workspace_members')
+    op.drop_table('workspace_members')
+    op.drop_index('ix_tasks_workspace_id', table_name='tasks')
+    op.drop_index('ix_tasks_creator', table_name='tasks')
+    op.drop_table('tasks')
+    op.drop_index('ix_invites_workspace', table_name='invites')
+    op.drop_index(op.f('ix_invites_token'), table_name='invites')
+    op.drop_table('invites')
+    op.drop_index('ix_email_invites_workspace', table_name='email_invites')
+    op.drop_index(op.f('ix_email_invites_token'), table_name='email_invites')
+    op.drop_index('ix_email_invites_email', table_name='email_invites')
+    op.drop_table('email_invites')
+    op.drop_table('workspaces')
+    op.drop_index('messages_unread_idx', table_name='messages', postgresql_where=sa.text('is_read IS false'), sqlite_where=sa.text('is_read IS false'))
+    op.drop_index('ix_messages_sender_receiver', table_name='messages')
+    op.drop_index('ix_messages_receiver_sender', table_name='messages')
+    op.drop_table('messages')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    bind = op.get_bind()
+    invite_status.drop(bind, checkfirst=True)
+    workspace_role.drop(bind, checkfirst=True)
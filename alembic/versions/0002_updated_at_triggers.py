@@ -0,0 +1,56 @@
+"""updated_at triggers
+
+Триггеры БД выставляют updated_at при каждом UPDATE в users, workspaces, tasks
+и comments (колонки объявлены с server_onupdate=FetchedValue()).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-15
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+TABLES = ("users", "workspaces", "tasks", "comments")
+
+def upgrade() -> None:
+    dialect = op.get_context().dialect.name
+    if dialect == "postgresql":
+        op.execute("""
+            CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at = now();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+        """)
+        for table in TABLES:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}")
+            op.execute(f"""
+                CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+            """)
+    elif dialect == "sqlite":
+        for table in TABLES:
+            op.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_set_updated_at AFTER UPDATE ON {table}
+                FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+                BEGIN
+                    UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+                END
+            """)
+    else:
+        raise NotImplementedError(f"updated_at triggers are not implemented for {dialect}")
+
+def downgrade() -> None:
+    dialect = op.get_context().dialect.name
+    for table in TABLES:
+        if dialect == "postgresql":
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}")
+        else:
+            op.execute(f"DROP TRIGGER IF EXISTS {table}_set_updated_at")
+    if dialect == "postgresql":
+        op.execute("DROP FUNCTION IF EXISTS set_updated_at()")
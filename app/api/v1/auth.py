@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from sqlalchemy import exists
 from datetime import timedelta
 from typing import Dict
 
@@ -8,7 +9,7 @@ from app.database.database import get_db
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse, Token
 from app.core.security import (
-    verify_password, get_password_hash, create_access_token,
+    verify_and_update_password, get_password_hash, create_access_token,
     ACCESS_TOKEN_EXPIRE_MINUTES, get_current_active_user
 )
 
@@ -18,8 +19,8 @@ router = APIRouter()
 def register(user_data: UserCreate, db: Session = Depends(get_db)):
     """Регистрация нового пользователя"""
     # Проверяем, существует ли пользователь с таким email
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    email_taken = db.query(exists().where(User.email == user_data.email)).scalar()
+    if email_taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
@@ -50,13 +51,19 @@ def login(
     # OAuth2PasswordRequestForm использует поле username как email
     user = db.query(User).filter(User.email == form_data.username).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    verified, new_hash = verify_and_update_password(form_data.password, user.hashed_password) if user else (False, None)
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Хеш устаревшей схемы или с меньшим числом раундов заменяем новым
+    if new_hash:
+        user.hashed_password = new_hash
+        db.commit()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
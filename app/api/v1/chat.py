@@ -1,87 +1,224 @@
 from fastapi import APIRouter, Depends, WebSocket, WebSocketDisconnect, Query, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from typing import List, Dict, Set
-import json
+from sqlalchemy import case, func, or_, select, update
+from typing import List, Dict, Set, Optional
 import asyncio
+import logging
+import os
+import orjson
 from datetime import datetime
 
-from app.database.database import get_db
+from app.database.database import get_db, SessionLocal
 from app.models.user import User
 from app.models.workspace import Workspace, WorkspaceMember
 from app.models.message import Message, WorkspaceMessage
-from app.schemas.message import MessageResponse, WorkspaceMessageResponse, RecentChat
-from app.core.security import get_current_active_user, verify_token
+from app.schemas.message import (
+    MessageResponse, MessagesReadRequest, WorkspaceMessageResponse, RecentChat, MESSAGES_ADAPTER
+)
+from app.core.security import get_current_active_user, verify_token_async
+from app.core.access import check_workspace_access
+from app.core.cache import workspace_access_cache
+from app.services.message_writer import message_writer
 
 router = APIRouter()
 
+logger = logging.getLogger(__name__)
+
+# Redis для доставки сообщений между воркерами. Без REDIS_URL сообщения
+# доставляются только клиентам, подключенным к этому процессу
+REDIS_URL = os.getenv("REDIS_URL")
+
+# Максимальное число неотправленных сообщений в очереди одного клиента
+SEND_QUEUE_MAXSIZE = 100
+
+class ClientConnection:
+    """WebSocket клиента с собственной очередью исходящих сообщений"""
+    
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SEND_QUEUE_MAXSIZE)
+        self.sender_task = asyncio.create_task(self._send_loop())
+    
+    async def _send_loop(self):
+        """Отправляет сообщения из очереди клиенту по одному"""
+        try:
+            while True:
+                payload = await self.queue.get()
+                await self.websocket.send_text(payload)
+        except Exception:
+            # Соединение закрыто, дальнейшие сообщения не доставляются
+            pass
+    
+    async def _close_websocket(self, code: int):
+        try:
+            await self.websocket.close(code=code)
+        except Exception:
+            pass
+    
+    def send(self, payload: str) -> bool:
+        """Поставить сообщение в очередь. False, если клиент отключен или не успевает читать"""
+        if self.sender_task.done():
+            return False
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            return False
+        return True
+    
+    def close(self, code: Optional[int] = None):
+        """Остановить отправку и при необходимости закрыть соединение с кодом code"""
+        self.sender_task.cancel()
+        if code is not None:
+            # Закрываем в фоне, чтобы медленный клиент не задерживал отправителя
+            self.sender_task = asyncio.create_task(self._close_websocket(code))
+
 # Хранилище активных WebSocket соединений
 class ConnectionManager:
     def __init__(self):
-        self.personal_connections: Dict[int, WebSocket] = {}  # user_id -> websocket
-        self.workspace_connections: Dict[int, Dict[int, WebSocket]] = {}  # workspace_id -> {user_id -> websocket}
+        self.personal_connections: Dict[int, ClientConnection] = {}  # user_id -> connection
+        self.workspace_connections: Dict[int, Dict[int, ClientConnection]] = {}  # workspace_id -> {user_id -> connection}
+        self.redis = None  # клиент Redis, если задан REDIS_URL
+        self.subscriber_task: Optional[asyncio.Task] = None
     
     async def connect_personal(self, user_id: int, websocket: WebSocket):
         """Подключить личный чат"""
-        self.personal_connections[user_id] = websocket
+        previous = self.personal_connections.get(user_id)
+        if previous:
+            previous.close()
+        self.personal_connections[user_id] = ClientConnection(websocket)
     
-    async def disconnect_personal(self, user_id: int):
+    async def disconnect_personal(self, user_id: int, code: Optional[int] = None):
         """Отключить личный чат"""
-        if user_id in self.personal_connections:
-            del self.personal_connections[user_id]
+        connection = self.personal_connections.pop(user_id, None)
+        if connection:
+            connection.close(code)
     
     async def connect_workspace(self, workspace_id: int, user_id: int, websocket: WebSocket):
         """Подключить к групповому чату"""
         if workspace_id not in self.workspace_connections:
             self.workspace_connections[workspace_id] = {}
-        self.workspace_connections[workspace_id][user_id] = websocket
+        previous = self.workspace_connections[workspace_id].get(user_id)
+        if previous:
+            previous.close()
+        self.workspace_connections[workspace_id][user_id] = ClientConnection(websocket)
     
-    async def disconnect_workspace(self, workspace_id: int, user_id: int):
+    async def disconnect_workspace(self, workspace_id: int, user_id: int, code: Optional[int] = None):
         """Отключить от группового чата"""
         if workspace_id in self.workspace_connections:
-            if user_id in self.workspace_connections[workspace_id]:
-                del self.workspace_connections[workspace_id][user_id]
+            connection = self.workspace_connections[workspace_id].pop(user_id, None)
+            if connection:
+                connection.close(code)
             if not self.workspace_connections[workspace_id]:
                 del self.workspace_connections[workspace_id]
     
     async def send_personal_message(self, message: dict, receiver_id: int):
         """Отправить личное сообщение"""
-        if receiver_id in self.personal_connections:
-            websocket = self.personal_connections[receiver_id]
-            try:
-                await websocket.send_text(json.dumps(message))
-            except:
-                # Соединение закрыто, удаляем
-                await self.disconnect_personal(receiver_id)
+        payload = orjson.dumps(message).decode()
+        if await self._publish(f"chat:personal:{receiver_id}", payload):
+            return
+        await self._deliver_personal(payload, receiver_id)
     
     async def broadcast_to_workspace(self, message: dict, workspace_id: int, sender_id: int):
         """Отправить сообщение всем в рабочем пространстве, кроме отправителя"""
-        if workspace_id in self.workspace_connections:
-            for user_id, websocket in self.workspace_connections[workspace_id].items():
-                if user_id != sender_id:  # Не отправляем отправителю
-                    try:
-                        await websocket.send_text(json.dumps(message))
-                    except:
-                        # Соединение закрыто, удаляем
-                        await self.disconnect_workspace(workspace_id, user_id)
+        # Сериализуем один раз (orjson) для всех получателей
+        payload = orjson.dumps(message).decode()
+        if await self._publish(f"chat:workspace:{workspace_id}", payload):
+            return
+        await self._deliver_workspace(payload, workspace_id, sender_id)
+    
+    async def _deliver_personal(self, payload: str, receiver_id: int):
+        """Доставить личное сообщение клиенту, подключенному к этому процессу"""
+        connection = self.personal_connections.get(receiver_id)
+        if connection and not connection.send(payload):
+            # Соединение закрыто или очередь переполнена, отключаем
+            await self.disconnect_personal(receiver_id, code=1013)
+    
+    async def _deliver_workspace(self, payload: str, workspace_id: int, sender_id: int):
+        """Доставить сообщение участникам рабочего пространства, подключенным к этому процессу"""
+        # Снимок соединений: при отключении словарь изменяется
+        recipients = [
+            (user_id, connection)
+            for user_id, connection in self.workspace_connections.get(workspace_id, {}).items()
+            if user_id != sender_id  # Не отправляем отправителю
+        ]
+        
+        # Только ставим в очереди получателей, медленный клиент не задерживает остальных
+        for user_id, connection in recipients:
+            if not connection.send(payload):
+                # Соединение закрыто или очередь переполнена, отключаем
+                await self.disconnect_workspace(workspace_id, user_id, code=1013)
+    
+    async def _publish(self, channel: str, payload: str) -> bool:
+        """Опубликовать сообщение в Redis. False, если Redis не используется или недоступен"""
+        if self.redis is None:
+            return False
+        try:
+            await self.redis.publish(channel, payload)
+            return True
+        except Exception as e:
+            # Redis недоступен: доставляем хотя бы локальным клиентам
+            logger.warning("Redis publish failed: %s", e)
+            return False
+    
+    async def start(self):
+        """Подключиться к Redis и запустить подписчика (один на процесс)"""
+        if not REDIS_URL:
+            return
+        import redis.asyncio as aioredis
+        
+        self.redis = aioredis.from_url(REDIS_URL, decode_responses=True)
+        self.subscriber_task = asyncio.create_task(self._listen())
+    
+    async def stop(self):
+        """Остановить подписчика и закрыть соединение с Redis"""
+        if self.subscriber_task:
+            self.subscriber_task.cancel()
+            self.subscriber_task = None
+        if self.redis is not None:
+            await self.redis.close()
+            self.redis = None
+    
+    async def _listen(self):
+        """Получает сообщения всех воркеров из Redis и доставляет их локальным клиентам"""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe("chat:personal:*", "chat:workspace:*")
+                async for item in pubsub.listen():
+                    if item["type"] != "pmessage":
+                        continue
+                    _, kind, target_id = item["channel"].split(":")
+                    payload = item["data"]
+                    if kind == "personal":
+                        await self._deliver_personal(payload, int(target_id))
+                    else:
+                        sender_id = orjson.loads(payload)["sender_id"]
+                        await self._deliver_workspace(payload, int(target_id), sender_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Переподключаемся после обрыва соединения с Redis
+                logger.warning("Redis subscriber error: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.reset()
 
 manager = ConnectionManager()
 
-def check_workspace_access(workspace_id: int, user: User, db: Session) -> Workspace:
-    """Проверяет доступ пользователя к рабочему пространству"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-    
-    # Проверяем, является ли пользователь владельцем или участником
-    if workspace.owner_id != user.id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied to workspace")
-    
-    return workspace
+# Колонки ответов истории сообщений
+MESSAGE_COLUMNS = (
+    Message.id, Message.content, Message.sender_id, Message.receiver_id,
+    Message.is_read, Message.created_at, Message.read_at
+)
+WORKSPACE_MESSAGE_COLUMNS = (
+    WorkspaceMessage.id, WorkspaceMessage.content, WorkspaceMessage.workspace_id,
+    WorkspaceMessage.sender_id, WorkspaceMessage.created_at
+)
+SENDER_COLUMNS = (
+    User.id.label("sender_user_id"), User.name.label("sender_name"),
+    User.email.label("sender_email"), User.avatar.label("sender_avatar")
+)
 
 @router.websocket("/ws")
 async def websocket_personal_chat(websocket: WebSocket, token: str = Query(...)):
@@ -90,64 +227,60 @@ async def websocket_personal_chat(websocket: WebSocket, token: str = Query(...))
     
     try:
         # Проверяем токен
-        email = verify_token(token)
+        email = await verify_token_async(token)
         if not email:
             await websocket.close(code=1008, reason="Invalid token")
             return
         
-        # Получаем пользователя
-        from app.database.database import SessionLocal
-        db = SessionLocal()
-        try:
+        # Получаем пользователя. Сессии БД открываются только на время запросов,
+        # чтобы не занимать соединение из пула, пока клиент молчит
+        with SessionLocal() as db:
             user = db.query(User).filter(User.email == email).first()
-            if not user:
-                await websocket.close(code=1008, reason="User not found")
-                return
-            
-            # Подключаем пользователя
-            await manager.connect_personal(user.id, websocket)
-            
-            try:
-                while True:
-                    data = await websocket.receive_text()
-                    message_data = json.loads(data)
-                    
-                    # Сохраняем сообщение в базу данных
-                    message = Message(
-                        content=message_data["content"],
-                        sender_id=user.id,
-                        receiver_id=message_data["receiver_id"]
-                    )
-                    db.add(message)
-                    db.commit()
-                    db.refresh(message)
-                    
-                    # Формируем ответ
-                    response = {
-                        "id": message.id,
-                        "content": message.content,
-                        "sender_id": message.sender_id,
-                        "receiver_id": message.receiver_id,
-                        "is_read": message.is_read,
-                        "created_at": message.created_at.isoformat(),
-                        "sender": {
-                            "id": user.id,
-                            "name": user.name,
-                            "email": user.email,
-                            "avatar": user.avatar
-                        }
-                    }
-                    
-                    # Отправляем получателю
-                    await manager.send_personal_message(response, message.receiver_id)
-                    
-            except WebSocketDisconnect:
-                pass
-            finally:
-                await manager.disconnect_personal(user.id)
+        if not user:
+            await websocket.close(code=1008, reason="User not found")
+            return
+        
+        # Данные отправителя одинаковы для всех сообщений соединения
+        sender = {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "avatar": user.avatar
+        }
+        
+        # Подключаем пользователя
+        await manager.connect_personal(user.id, websocket)
+        
+        try:
+            while True:
+                data = await websocket.receive_text()
+                message_data = orjson.loads(data)
+                
+                # Сохраняем сообщение в базу данных (запись идет пачками, см. MessageWriter)
+                message_id, created_at = await message_writer.write(Message, {
+                    "content": message_data["content"],
+                    "sender_id": user.id,
+                    "receiver_id": message_data["receiver_id"]
+                })
+                
+                # Формируем ответ
+                response = {
+                    "id": message_id,
+                    "content": message_data["content"],
+                    "sender_id": user.id,
+                    "receiver_id": message_data["receiver_id"],
+                    "is_read": False,
+                    "created_at": created_at,  # orjson сериализует datetime сам
+                    "sender": sender
+                }
+                
+                # Отправляем получателю
+                await manager.send_personal_message(response, response["receiver_id"])
                 
+        except WebSocketDisconnect:
+            pass
         finally:
-            db.close()
+            await manager.disconnect_personal(user.id)
             
     except Exception as e:
         await websocket.close(code=1011, reason=str(e))
@@ -159,66 +292,66 @@ async def websocket_workspace_chat(websocket: WebSocket, workspace_id: int, toke
     
     try:
         # Проверяем токен
-        email = verify_token(token)
+        email = await verify_token_async(token)
         if not email:
             await websocket.close(code=1008, reason="Invalid token")
             return
         
-        # Получаем пользователя и проверяем доступ
-        from app.database.database import SessionLocal
-        db = SessionLocal()
-        try:
+        # Получаем пользователя и проверяем доступ. Сессии БД открываются только
+        # на время запросов, чтобы не занимать соединение из пула, пока клиент молчит
+        with SessionLocal() as db:
             user = db.query(User).filter(User.email == email).first()
             if not user:
                 await websocket.close(code=1008, reason="User not found")
                 return
             
-            # Проверяем доступ к рабочему пространству
-            workspace = check_workspace_access(workspace_id, user, db)
-            
-            # Подключаем пользователя к чату
-            await manager.connect_workspace(workspace_id, user.id, websocket)
-            
-            try:
-                while True:
-                    data = await websocket.receive_text()
-                    message_data = json.loads(data)
-                    
-                    # Сохраняем сообщение в базу данных
-                    message = WorkspaceMessage(
-                        content=message_data["content"],
-                        workspace_id=workspace_id,
-                        sender_id=user.id
-                    )
-                    db.add(message)
-                    db.commit()
-                    db.refresh(message)
-                    
-                    # Формируем ответ
-                    response = {
-                        "id": message.id,
-                        "content": message.content,
-                        "workspace_id": message.workspace_id,
-                        "sender_id": message.sender_id,
-                        "created_at": message.created_at.isoformat(),
-                        "sender": {
-                            "id": user.id,
-                            "name": user.name,
-                            "email": user.email,
-                            "avatar": user.avatar
-                        }
-                    }
-                    
-                    # Отправляем всем участникам рабочего пространства
-                    await manager.broadcast_to_workspace(response, workspace_id, user.id)
-                    
-            except WebSocketDisconnect:
-                pass
-            finally:
-                await manager.disconnect_workspace(workspace_id, user.id)
+            # Проверяем доступ к рабочему пространству. Подтвержденный доступ кэшируется,
+            # чтобы частые переподключения не обращались к БД (в других воркерах отзыв
+            # доступа виден с задержкой до ttl кэша, см. workspace_access_cache)
+            if not workspace_access_cache.get((workspace_id, user.id)):
+                check_workspace_access(workspace_id, user, db)
+                workspace_access_cache.set((workspace_id, user.id), True)
+        
+        # Данные отправителя одинаковы для всех сообщений соединения
+        sender = {
+            "id": user.id,
+            "name": user.name,
+            "email": user.email,
+            "avatar": user.avatar
+        }
+        
+        # Подключаем пользователя к чату
+        await manager.connect_workspace(workspace_id, user.id, websocket)
+        
+        try:
+            while True:
+                data = await websocket.receive_text()
+                message_data = orjson.loads(data)
+                
+                # Сохраняем сообщение в базу данных (запись идет пачками, см. MessageWriter)
+                message_id, created_at = await message_writer.write(WorkspaceMessage, {
+                    "content": message_data["content"],
+                    "workspace_id": workspace_id,
+                    "sender_id": user.id
+                })
                 
+                # Формируем ответ
+                response = {
+                    "id": message_id,
+                    "content": message_data["content"],
+                    "workspace_id": workspace_id,
+                    "sender_id": user.id,
+                    "created_at": created_at,  # orjson сериализует datetime сам
+                    "sender": sender
+                }
+                
+                # Отправляем всем участникам рабочего пространства
+                await manager.broadcast_to_workspace(response, workspace_id, user.id)
+                
+        except WebSocketDisconnect:
+            pass
         finally:
-            db.close()
+            await manager.disconnect_workspace(workspace_id, user.id)
             
     except Exception as e:
         await websocket.close(code=1011, reason=str(e))
@@ -232,13 +365,47 @@ def get_chat_history(
     db: Session = Depends(get_db)
 ):
     """Получить историю личных сообщений с пользователем"""
-    messages = db.query(Message).filter(
-        ((Message.sender_id == current_user.id) & (Message.receiver_id == user_id)) |
-        ((Message.sender_id == user_id) & (Message.receiver_id == current_user.id))
-    ).order_by(Message.created_at.desc()).offset(offset).limit(limit).all()
+    # Выбираем только колонки ответа, без создания ORM объектов
+    messages = db.execute(
+        select(*MESSAGE_COLUMNS).where(
+            ((Message.sender_id == current_user.id) & (Message.receiver_id == user_id)) |
+            ((Message.sender_id == user_id) & (Message.receiver_id == current_user.id))
+        ).order_by(Message.created_at.desc()).offset(offset).limit(limit)
+    ).mappings().all()
+    
+    # Строки уже в формате ответа: сериализуем orjson напрямую, без схем Pydantic
+    return ORJSONResponse([dict(message) for message in messages])
+
+def mark_messages_as_read(message_ids: List[int], user: User, db: Session) -> list:
+    """Отмечает сообщения пользователя как прочитанные одним UPDATE ... RETURNING"""
+    # Убираем повторы, сохраняя порядок
+    message_ids = list(dict.fromkeys(message_ids))
+    if not message_ids:
+        return []
+    
+    # Обновляются только сообщения, получателем которых является пользователь
+    messages = db.execute(
+        update(Message).where(
+            Message.id.in_(message_ids),
+            Message.receiver_id == user.id
+        ).values(
+            is_read=True,
+            read_at=datetime.utcnow()
+        ).returning(*MESSAGE_COLUMNS).execution_options(synchronize_session=False)
+    ).mappings().all()
+    db.commit()
     
     return messages
 
+@router.post("/messages/read", response_model=List[MessageResponse])
+def mark_messages_as_read_batch(
+    read_data: MessagesReadRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """Отметить несколько сообщений как прочитанные"""
+    return MESSAGES_ADAPTER.validate_python(mark_messages_as_read(read_data.ids, current_user, db))
+
 @router.patch("/messages/{message_id}/read", response_model=MessageResponse)
 def mark_message_as_read(
     message_id: int,
@@ -246,20 +413,17 @@ def mark_message_as_read(
     db: Session = Depends(get_db)
 ):
     """Отметить сообщение как прочитанное"""
-    message = db.query(Message).filter(Message.id == message_id).first()
+    messages = mark_messages_as_read([message_id], current_user, db)
+    if messages:
+        return messages[0]
+    
+    # Ничего не обновлено: сообщения нет или пользователь не получатель
+    message = db.query(Message.receiver_id).filter(Message.id == message_id).first()
     if not message:
         raise HTTPException(status_code=404, detail="Message not found")
     
     # Только получатель может отметить сообщение как прочитанное
-    if message.receiver_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Only receiver can mark message as read")
-    
-    message.is_read = True
-    message.read_at = datetime.utcnow()
-    db.commit()
-    db.refresh(message)
-    
-    return message
+    raise HTTPException(status_code=403, detail="Only receiver can mark message as read")
 
 @router.get("/unread-count")
 def get_unread_count(
@@ -269,7 +433,7 @@ def get_unread_count(
     """Получить количество непрочитанных сообщений"""
     count = db.query(Message).filter(
         Message.receiver_id == current_user.id,
-        Message.is_read == False
+        Message.is_read.is_(False)
     ).count()
     
     return count
@@ -286,11 +450,29 @@ def get_workspace_chat_history(
     # Проверяем доступ
     workspace = check_workspace_access(workspace_id, current_user, db)
     
-    messages = db.query(WorkspaceMessage).filter(
-        WorkspaceMessage.workspace_id == workspace_id
-    ).order_by(WorkspaceMessage.created_at.desc()).offset(offset).limit(limit).all()
+    # Колонки сообщений и данные отправителя одним запросом, без создания ORM объектов
+    rows = db.execute(
+        select(*WORKSPACE_MESSAGE_COLUMNS, *SENDER_COLUMNS).outerjoin(
+            User, User.id == WorkspaceMessage.sender_id
+        ).where(
+            WorkspaceMessage.workspace_id == workspace_id
+        ).order_by(WorkspaceMessage.created_at.desc()).offset(offset).limit(limit)
+    ).mappings().all()
     
-    return messages
+    messages = []
+    for row in rows:
+        message = {column.key: row[column.key] for column in WORKSPACE_MESSAGE_COLUMNS}
+        if row["sender_user_id"] is not None:
+            message["sender"] = {
+                "id": row["sender_user_id"],
+                "name": row["sender_name"],
+                "email": row["sender_email"],
+                "avatar": row["sender_avatar"]
+            }
+        messages.append(message)
+    
+    # Словари уже в формате ответа: сериализуем orjson напрямую, без схем Pydantic
+    return ORJSONResponse(messages)
 
 @router.get("/recent", response_model=List[RecentChat])
 def get_recent_chats(
@@ -300,40 +482,59 @@ def get_recent_chats(
     """Получить список недавних чатов"""
     recent_chats = []
     
-    # Получаем недавние личные сообщения
-    personal_messages = db.query(Message).filter(
-        (Message.sender_id == current_user.id) | (Message.receiver_id == current_user.id)
-    ).order_by(Message.created_at.desc()).limit(10).all()
+    # Получаем последние личные переписки: по одной строке на собеседника
+    # (последнее сообщение) вместе с данными собеседника
+    other_user_id = case(
+        (Message.sender_id == current_user.id, Message.receiver_id),
+        else_=Message.sender_id
+    )
+    conversations = select(
+        other_user_id.label("user_id"),
+        Message.created_at.label("created_at"),
+        func.row_number().over(
+            partition_by=other_user_id,
+            order_by=(Message.created_at.desc(), Message.id.desc())
+        ).label("row_number")
+    ).where(
+        or_(Message.sender_id == current_user.id, Message.receiver_id == current_user.id)
+    ).subquery()
     
-    for msg in personal_messages:
-        other_user_id = msg.receiver_id if msg.sender_id == current_user.id else msg.sender_id
-        other_user = db.query(User).filter(User.id == other_user_id).first()
-        
-        if other_user:
-            recent_chats.append(RecentChat(
-                id=f"personal_{other_user_id}",
-                type="personal",
-                userId=other_user_id,
-                name=other_user.name or other_user.email,
-                avatar=other_user.avatar,
-                lastActivityAt=msg.created_at
-            ))
-    
-    # Получаем рабочие пространства пользователя
-    user_workspaces = db.query(Workspace).filter(Workspace.owner_id == current_user.id).all()
-    member_workspaces = db.query(Workspace).join(WorkspaceMember).filter(
+    personal_chats = db.query(User, conversations.c.created_at).join(
+        conversations, conversations.c.user_id == User.id
+    ).filter(
+        conversations.c.row_number == 1
+    ).order_by(conversations.c.created_at.desc()).limit(20).all()
+    
+    for other_user, last_message_at in personal_chats:
+        recent_chats.append(RecentChat(
+            id=f"personal_{other_user.id}",
+            type="personal",
+            userId=other_user.id,
+            name=other_user.name or other_user.email,
+            avatar=other_user.avatar,
+            lastActivityAt=last_message_at
+        ))
+    
+    # Получаем рабочие пространства пользователя (владелец или участник) одним запросом
+    # вместе со временем последнего сообщения в групповом чате
+    last_activity_at = select(func.max(WorkspaceMessage.created_at)).where(
+        WorkspaceMessage.workspace_id == Workspace.id
+    ).correlate(Workspace).scalar_subquery()
+    member_workspace_ids = select(WorkspaceMember.workspace_id).where(
         WorkspaceMember.user_id == current_user.id
-    ).all()
+    )
     
-    all_workspaces = list({w.id: w for w in user_workspaces + member_workspaces}.values())
+    workspaces = db.query(Workspace, last_activity_at).filter(
+        or_(Workspace.owner_id == current_user.id, Workspace.id.in_(member_workspace_ids))
+    ).all()
     
-    for workspace in all_workspaces:
+    for workspace, workspace_last_activity_at in workspaces:
         recent_chats.append(RecentChat(
             id=f"workspace_{workspace.id}",
             type="workspace",
             workspaceId=workspace.id,
             name=workspace.name,
-            lastActivityAt=None  # Можно добавить последнее сообщение из группового чата
+            lastActivityAt=workspace_last_activity_at
         ))
     
     # Сортируем по времени активности
@@ -1,41 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, select
 from typing import List
 
 from app.database.database import get_db
 from app.models.user import User
 from app.models.task import Task
-from app.models.workspace import Workspace, WorkspaceMember
+from app.models.workspace import Workspace
 from app.models.comment import Comment
 from app.schemas.comment import (
     CommentCreate, CommentUpdate, CommentResponse, CommentsQuery
 )
 from app.core.security import get_current_active_user
+from app.core.access import get_task_with_access
 
 router = APIRouter()
 
-def check_task_access(task_id: int, user: User, db: Session) -> Task:
-    """Проверяет доступ пользователя к задаче"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Проверяем доступ к рабочему пространству задачи
-    workspace = db.query(Workspace).filter(Workspace.id == task.workspace_id).first()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-    
-    # Проверяем, является ли пользователь владельцем или участником
-    if workspace.owner_id != user.id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace.id,
-            WorkspaceMember.user_id == user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied to task")
-    
-    return task
+# Колонки ответа со списком комментариев и автора
+COMMENT_COLUMNS = (
+    Comment.id, Comment.content, Comment.task_id, Comment.author_id,
+    Comment.created_at, Comment.updated_at
+)
+AUTHOR_COLUMNS = (
+    User.id, User.email, User.name, User.position, User.avatar,
+    User.is_active, User.created_at, User.updated_at
+)
 
 @router.get("/tasks/{task_id}/comments", response_model=List[CommentResponse])
 def get_task_comments(
@@ -47,9 +37,13 @@ def get_task_comments(
     db: Session = Depends(get_db)
 ):
     """Получить комментарии задачи"""
-    task = check_task_access(task_id, current_user, db)
+    task, _ = get_task_with_access(task_id, current_user, db, detail="Access denied to task")
     
-    query = db.query(Comment).filter(Comment.task_id == task_id)
+    # Колонки комментариев и автора одним запросом, без создания ORM объектов
+    author_labels = [column.label(f"author_{column.key}") for column in AUTHOR_COLUMNS]
+    query = select(*COMMENT_COLUMNS, *author_labels).join(
+        User, User.id == Comment.author_id
+    ).where(Comment.task_id == task_id)
     
     # Сортировка
     if order == "asc":
@@ -57,8 +51,15 @@ def get_task_comments(
     else:
         query = query.order_by(Comment.created_at.desc())
     
-    comments = query.offset(offset).limit(limit).all()
-    return comments
+    rows = db.execute(query.offset(offset).limit(limit)).mappings().all()
+    
+    comments = []
+    for row in rows:
+        comment = {column.key: row[column.key] for column in COMMENT_COLUMNS}
+        comment["author"] = {column.key: row[f"author_{column.key}"] for column in AUTHOR_COLUMNS}
+        comments.append(comment)
+    
+    return ORJSONResponse(comments)
 
 @router.get("/tasks/{task_id}/comments/count")
 def get_task_comments_count(
@@ -67,7 +68,7 @@ def get_task_comments_count(
     db: Session = Depends(get_db)
 ):
     """Получить количество комментариев задачи"""
-    task = check_task_access(task_id, current_user, db)
+    task, _ = get_task_with_access(task_id, current_user, db, detail="Access denied to task")
     
     count = db.query(func.count(Comment.id)).filter(Comment.task_id == task_id).scalar()
     return count
@@ -80,7 +81,7 @@ def create_comment(
     db: Session = Depends(get_db)
 ):
     """Создать комментарий к задаче"""
-    task = check_task_access(task_id, current_user, db)
+    task, _ = get_task_with_access(task_id, current_user, db, detail="Access denied to task")
     
     comment = Comment(
         content=comment_data.content,
@@ -123,15 +124,18 @@ def delete_comment(
     db: Session = Depends(get_db)
 ):
     """Удалить комментарий"""
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
+    # Комментарий и владелец рабочего пространства его задачи одним запросом
+    row = db.query(Comment, Workspace.owner_id).join(
+        Task, Task.id == Comment.task_id
+    ).join(
+        Workspace, Workspace.id == Task.workspace_id
+    ).filter(Comment.id == comment_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Comment not found")
     
     # Проверяем права: автор или владелец рабочего пространства может удалить
-    task = db.query(Task).filter(Task.id == comment.task_id).first()
-    workspace = db.query(Workspace).filter(Workspace.id == task.workspace_id).first()
-    
-    if comment.author_id != current_user.id and workspace.owner_id != current_user.id:
+    comment, owner_id = row
+    if comment.author_id != current_user.id and owner_id != current_user.id:
         raise HTTPException(
             status_code=403, 
             detail="Only author or workspace owner can delete comment"
@@ -1,25 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import exists, insert, literal, select
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime, timedelta
 import secrets
-import uuid
 from typing import List, Optional
 
 from app.database.database import get_db
 from app.models.user import User
 from app.models.workspace import Workspace, WorkspaceMember
 from app.models.invite import Invite, EmailInvite
+from app.models.enums import Role, InviteStatus
 from app.schemas.invite import (
     InviteCreate, InviteResponse, EmailInviteResponse,
-    InviteLinkItem, IncomingInvite
+    InviteLinkItem, IncomingInvite,
+    INVITE_LINKS_ADAPTER, EMAIL_INVITES_ADAPTER
 )
 from app.core.security import get_current_active_user
+from app.core.cache import workspace_members_cache
 
 router = APIRouter()
 
+# Количество случайных байт в токене приглашения (43 символа в base64url)
+INVITE_TOKEN_BYTES = 32
+
 def generate_invite_token() -> str:
     """Генерирует уникальный токен приглашения"""
-    return secrets.token_urlsafe(32)
+    return secrets.token_urlsafe(INVITE_TOKEN_BYTES)
 
 @router.post("/workspaces/{workspace_id}/invites")
 def create_workspace_invite(
@@ -45,7 +52,7 @@ def create_workspace_invite(
         token=token,
         workspace_id=workspace_id,
         inviter_id=current_user.id,
-        role="reader",  # роль по умолчанию
+        role=Role.reader,  # роль по умолчанию
         expires_at=expires_at
     )
     
@@ -76,7 +83,7 @@ def get_workspace_invites(
         raise HTTPException(status_code=403, detail="Only owner can view invites")
     
     invites = db.query(Invite).filter(Invite.workspace_id == workspace_id).all()
-    return invites
+    return INVITE_LINKS_ADAPTER.validate_python(invites, from_attributes=True)
 
 @router.delete("/invites/revoke/{token}")
 def revoke_invite(
@@ -85,16 +92,18 @@ def revoke_invite(
     db: Session = Depends(get_db)
 ):
     """Отозвать приглашение"""
-    invite = db.query(Invite).filter(Invite.token == token).first()
-    if not invite:
+    row = db.query(Invite, Workspace.owner_id).join(
+        Workspace, Workspace.id == Invite.workspace_id
+    ).filter(Invite.token == token).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Invite not found")
     
     # Только владелец рабочего пространства может отозвать приглашение
-    workspace = db.query(Workspace).filter(Workspace.id == invite.workspace_id).first()
-    if workspace.owner_id != current_user.id:
+    invite, owner_id = row
+    if owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only workspace owner can revoke invite")
     
-    invite.status = "expired"
+    invite.status = InviteStatus.expired
     db.commit()
     
     return {"message": "Invite revoked successfully"}
@@ -106,45 +115,65 @@ def accept_invite(
     db: Session = Depends(get_db)
 ):
     """Принять приглашение"""
-    invite = db.query(Invite).filter(
-        Invite.token == token,
-        Invite.status == "pending"
-    ).first()
+    now = datetime.utcnow()
     
-    if not invite:
-        raise HTTPException(status_code=404, detail="Invite not found or expired")
-    
-    if invite.expires_at < datetime.utcnow():
-        invite.status = "expired"
-        db.commit()
-        raise HTTPException(status_code=400, detail="Invite has expired")
-    
-    # Проверяем, не является ли пользователь уже участником
-    existing_membership = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == invite.workspace_id,
+    # Добавляем участника прямо из приглашения одним INSERT ... SELECT: только для
+    # действующего приглашения и если пользователь еще не состоит в рабочем пространстве
+    already_member = exists().where(
+        WorkspaceMember.workspace_id == Invite.workspace_id,
         WorkspaceMember.user_id == current_user.id
-    ).first()
-    
-    if existing_membership:
-        raise HTTPException(status_code=400, detail="User is already a member of this workspace")
-    
-    # Добавляем пользователя в рабочее пространство
-    member = WorkspaceMember(
-        workspace_id=invite.workspace_id,
-        user_id=current_user.id,
-        role=invite.role
     )
+    new_member = select(Invite.workspace_id, literal(current_user.id), Invite.role).where(
+        Invite.token == token,
+        Invite.status == InviteStatus.pending,
+        Invite.expires_at >= now,
+        ~already_member
+    )
+    try:
+        workspace_id = db.execute(
+            insert(WorkspaceMember).from_select(
+                ["workspace_id", "user_id", "role"], new_member
+            ).returning(WorkspaceMember.workspace_id)
+        ).scalar()
+    except IntegrityError:
+        # Параллельный запрос уже добавил пользователя
+        db.rollback()
+        raise HTTPException(status_code=400, detail="User is already a member of this workspace")
     
-    db.add(member)
+    if workspace_id is None:
+        # Участник не добавлен, выясняем причину
+        invite = db.query(Invite).filter(
+            Invite.token == token,
+            Invite.status == InviteStatus.pending
+        ).first()
+        
+        if not invite:
+            raise HTTPException(status_code=404, detail="Invite not found or expired")
+        
+        if invite.expires_at < now:
+            invite.status = InviteStatus.expired
+            db.commit()
+            raise HTTPException(status_code=400, detail="Invite has expired")
+        
+        raise HTTPException(status_code=400, detail="User is already a member of this workspace")
     
-    # Обновляем статус приглашения
-    invite.status = "accepted"
-    invite.invitee_id = current_user.id
-    invite.accepted_at = datetime.utcnow()
+    # Обновляем статус приглашения, если его не принял параллельный запрос
+    updated = db.query(Invite).filter(
+        Invite.token == token,
+        Invite.status == InviteStatus.pending
+    ).update({
+        Invite.status: InviteStatus.accepted,
+        Invite.invitee_id: current_user.id,
+        Invite.accepted_at: now
+    }, synchronize_session=False)
+    if not updated:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="Invite not found or expired")
     
     db.commit()
+    workspace_members_cache.pop_where(lambda key: key[0] == workspace_id)
     
-    return {"workspace_id": invite.workspace_id}
+    return {"workspace_id": workspace_id}
 
 @router.get("/invites/validate/{token}")
 def validate_invite(
@@ -152,20 +181,24 @@ def validate_invite(
     db: Session = Depends(get_db)
 ):
     """Валидировать приглашение"""
-    invite = db.query(Invite).filter(Invite.token == token).first()
-    
-    if not invite:
+    # Приглашение, рабочее пространство и пригласивший пользователь одним запросом
+    row = db.query(Invite, Workspace, User).join(
+        Workspace, Workspace.id == Invite.workspace_id
+    ).join(
+        User, User.id == Invite.inviter_id
+    ).filter(Invite.token == token).first()
+    
+    if not row:
         raise HTTPException(status_code=404, detail="Invite not found")
     
-    if invite.status != "pending":
+    invite, workspace, inviter = row
+    
+    if invite.status != InviteStatus.pending:
         raise HTTPException(status_code=400, detail="Invite is not active")
     
     if invite.expires_at < datetime.utcnow():
         raise HTTPException(status_code=400, detail="Invite has expired")
     
-    workspace = db.query(Workspace).filter(Workspace.id == invite.workspace_id).first()
-    inviter = db.query(User).filter(User.id == invite.inviter_id).first()
-    
     return {
         "workspace_id": workspace.id,
         "workspace_name": workspace.name,
@@ -179,26 +212,36 @@ def get_my_invites(
     db: Session = Depends(get_db)
 ):
     """Получить входящие приглашения текущего пользователя"""
-    # Ищем email-приглашения для пользователя
-    email_invites = db.query(EmailInvite).filter(
-        EmailInvite.email == current_user.email,
-        EmailInvite.status == "pending"
+    # Email-приглашения создает владелец рабочего пространства: название пространства
+    # и имя владельца выбираются вместе с приглашениями одним JOIN-запросом
+    rows = db.execute(
+        select(
+            EmailInvite.id,
+            Workspace.name,
+            User.name,
+            User.email,
+            EmailInvite.role,
+            EmailInvite.created_at
+        ).join(
+            Workspace, Workspace.id == EmailInvite.workspace_id
+        ).join(
+            User, User.id == Workspace.owner_id
+        ).where(
+            EmailInvite.email == current_user.email,
+            EmailInvite.status == InviteStatus.pending
+        )
     ).all()
     
-    result = []
-    for email_invite in email_invites:
-        workspace = db.query(Workspace).filter(Workspace.id == email_invite.workspace_id).first()
-        # Здесь нужно получить информацию о приглашающем (можно добавить поле в EmailInvite)
-        
-        result.append(IncomingInvite(
-            id=email_invite.id,
-            workspace_name=workspace.name,
-            inviter_name="Workspace Owner",  # временно
-            role=email_invite.role,
-            created_at=email_invite.created_at
-        ))
-    
-    return result
+    return [
+        IncomingInvite.model_construct(
+            id=invite_id,
+            workspace_name=workspace_name,
+            inviter_name=owner_name or owner_email,
+            role=role,
+            created_at=created_at
+        )
+        for invite_id, workspace_name, owner_name, owner_email, role, created_at in rows
+    ]
 
 @router.post("/invites/{invite_id}/decline")
 def decline_invite(
@@ -215,7 +258,7 @@ def decline_invite(
     if email_invite.email != current_user.email:
         raise HTTPException(status_code=403, detail="This invite is not for you")
     
-    email_invite.status = "declined"
+    email_invite.status = InviteStatus.declined
     db.commit()
     
     return {"message": "Invite declined successfully"}
@@ -239,4 +282,4 @@ def get_workspace_email_invites(
         EmailInvite.workspace_id == workspace_id
     ).all()
     
-    return email_invites
+    return EMAIL_INVITES_ADAPTER.validate_python(email_invites, from_attributes=True)
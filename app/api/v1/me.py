@@ -20,7 +20,7 @@ def get_my_invites(
     return invites_get_my_invites(current_user, db)
 
 @router.get("/profile", response_model=UserResponse)
-def get_my_profile(
+async def get_my_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """Получить профиль текущего пользователя"""
@@ -1,23 +1,25 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from sqlalchemy.orm import Session
-import os
+import mimetypes
+import shutil
 import uuid
+from pathlib import Path
 from typing import Optional
 
 from app.database.database import get_db
 from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
-from app.core.security import get_current_active_user
+from app.core.security import get_current_active_user, verify_password, get_password_hash
 
 router = APIRouter()
 
 # Для загрузки аватаров (в продакшене использовать S3 или другое хранилище)
-UPLOAD_DIR = "uploads"
-if not os.path.exists(UPLOAD_DIR):
-    os.makedirs(UPLOAD_DIR)
+UPLOAD_DIR = Path("uploads")
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+UPLOAD_CHUNK_SIZE = 1 << 20
 
 @router.get("/me", response_model=UserResponse)
-def get_profile(
+async def get_profile(
     current_user: User = Depends(get_current_active_user)
 ):
     """Получить профиль текущего пользователя"""
@@ -30,7 +32,7 @@ def update_profile(
     db: Session = Depends(get_db)
 ):
     """Обновить профиль текущего пользователя"""
-    update_data = profile_data.dict(exclude_unset=True)
+    update_data = profile_data.model_dump(exclude_unset=True)
     
     for field, value in update_data.items():
         setattr(current_user, field, value)
@@ -53,16 +55,16 @@ def upload_avatar(
             detail="File must be an image"
         )
     
-    # Генерируем уникальное имя файла
-    file_extension = file.filename.split(".")[-1] if "." in file.filename else "jpg"
-    unique_filename = f"{uuid.uuid4()}.{file_extension}"
-    file_path = os.path.join(UPLOAD_DIR, unique_filename)
+    # Генерируем уникальное имя файла, расширение определяем по типу содержимого
+    file_extension = mimetypes.guess_extension(file.content_type) or ".jpg"
+    unique_filename = f"{uuid.uuid4().hex}{file_extension}"
+    file_path = UPLOAD_DIR / unique_filename
     
     # Сохраняем файл
     try:
+        # Копируем поток кусками по 1 МБ, не загружая файл в память целиком
         with open(file_path, "wb") as buffer:
-            content = file.file.read()
-            buffer.write(content)
+            shutil.copyfileobj(file.file, buffer, UPLOAD_CHUNK_SIZE)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,8 +88,6 @@ def change_password(
     db: Session = Depends(get_db)
 ):
     """Изменить пароль пользователя"""
-    from app.core.security import verify_password, get_password_hash
-    
     # Проверяем текущий пароль
     if not verify_password(current_password, current_user.hashed_password):
         raise HTTPException(
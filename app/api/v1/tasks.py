@@ -1,47 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from sqlalchemy.orm import Session, selectinload
+from sqlalchemy import case, delete, func, update
+from typing import List, Optional
 from datetime import datetime
 
 from app.database.database import get_db
 from app.models.user import User
-from app.models.workspace import Workspace, WorkspaceMember
+from app.models.workspace import WorkspaceMember
 from app.models.task import Task, task_assignees
+from app.models.comment import Comment
 from app.schemas.task import (
-    TaskCreate, TaskUpdate, TaskResponse, TasksResponse, TaskAssigneesRequest
+    TaskCreate, TaskUpdate, TaskResponse, TasksResponse, TaskAssigneesRequest, TASKS_ADAPTER
 )
 from app.core.security import get_current_active_user
+from app.core.access import check_workspace_access, get_task_with_access, task_access_condition
 
 router = APIRouter()
 
-def check_workspace_access(workspace_id: int, user: User, db: Session) -> Workspace:
-    """Проверяет доступ пользователя к рабочему пространству"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-    
-    # Проверяем, является ли пользователь владельцем или участником
-    if workspace.owner_id != user.id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied to workspace")
-    
-    return workspace
-
-@router.get("/workspaces/{workspace_id}/tasks", response_model=TasksResponse)
+@router.get(
+    "/workspaces/{workspace_id}/tasks",
+    response_model=None,
+    # Эндпоинт возвращает готовый JSON (Response), поэтому response_model и
+    # default_response_class к нему не применяются; схема указана для документации
+    responses={200: {"model": TasksResponse}}
+)
 def get_tasks(
     workspace_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
+    status_filter: Optional[str] = Query(None, alias="status"),
+    assignee_id: Optional[int] = Query(None),
+    before_id: Optional[int] = Query(None),  # keyset-пагинация: задачи с id меньше указанного
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Получить список задач рабочего пространства"""
     workspace = check_workspace_access(workspace_id, current_user, db)
     
-    tasks = db.query(Task).filter(Task.workspace_id == workspace_id).all()
-    return TasksResponse(tasks=tasks)
+    # Исполнители и создатели задач загружаются пачкой (IN), а не отдельным запросом на задачу
+    query = db.query(Task).options(
+        selectinload(Task.assignees),
+        selectinload(Task.creator)
+    ).filter(Task.workspace_id == workspace_id)
+    
+    # Фильтры
+    if status_filter is not None:
+        query = query.filter(Task.status == status_filter)
+    if assignee_id is not None:
+        query = query.filter(Task.assignees.any(User.id == assignee_id))
+    if before_id is not None:
+        query = query.filter(Task.id < before_id)
+    
+    # Новые задачи первыми, сортировка по индексу (workspace_id, id)
+    tasks = query.order_by(Task.id.desc()).offset(offset).limit(limit).all()
+    # Строки БД проверяются и преобразуются в TaskResponse один раз (validate_python),
+    # затем сразу сериализуются в JSON в pydantic-core. Пропускается только обработка
+    # response_model в FastAPI: model_dump в dict, повторная валидация и orjson.dumps
+    body = TasksResponse.model_construct(
+        tasks=TASKS_ADAPTER.validate_python(tasks, from_attributes=True)
+    ).model_dump_json()
+    return Response(content=body, media_type="application/json")
 
 @router.get("/{task_id}", response_model=TaskResponse)
 def get_task(
@@ -50,12 +68,7 @@ def get_task(
     db: Session = Depends(get_db)
 ):
     """Получить конкретную задачу"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Проверяем доступ к рабочему пространству задачи
-    check_workspace_access(task.workspace_id, current_user, db)
+    task, workspace = get_task_with_access(task_id, current_user, db)
     
     return task
 
@@ -92,23 +105,25 @@ def update_task(
     db: Session = Depends(get_db)
 ):
     """Обновить задачу"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Проверяем доступ к рабочему пространству
-    workspace = check_workspace_access(task.workspace_id, current_user, db)
-    
-    # Обновляем поля
-    update_data = task_data.dict(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(task, field, value)
+    values = task_data.model_dump(exclude_unset=True)
     
     # Если статус меняется на "done", устанавливаем время завершения
-    if task_data.status == "done" and task.completed_at is None:
-        task.completed_at = datetime.utcnow()
-    elif task_data.status != "done":
-        task.completed_at = None
+    if task_data.status == "done":
+        values["completed_at"] = func.coalesce(Task.completed_at, datetime.utcnow())
+    else:
+        values["completed_at"] = None
+    
+    # Обновление и проверка доступа одним UPDATE ... RETURNING
+    task = db.execute(
+        update(Task).where(
+            Task.id == task_id,
+            task_access_condition(current_user)
+        ).values(**values).returning(Task)
+    ).scalar_one_or_none()
+    if task is None:
+        # Ничего не обновлено: определяем причину (404 или 403)
+        get_task_with_access(task_id, current_user, db)
+        raise HTTPException(status_code=404, detail="Task not found")
     
     db.commit()
     db.refresh(task)
@@ -121,18 +136,16 @@ def delete_task(
     db: Session = Depends(get_db)
 ):
     """Удалить задачу"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Проверяем доступ к рабочему пространству
-    workspace = check_workspace_access(task.workspace_id, current_user, db)
+    task, workspace = get_task_with_access(task_id, current_user, db)
     
     # Только владелец рабочего пространства или создатель задачи может удалить её
     if workspace.owner_id != current_user.id and task.creator_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only workspace owner or task creator can delete task")
     
-    db.delete(task)
+    # Удаляем связанные строки и задачу напрямую, без загрузки коллекций для каскада
+    db.execute(delete(task_assignees).where(task_assignees.c.task_id == task_id))
+    db.execute(delete(Comment).where(Comment.task_id == task_id))
+    db.execute(delete(Task).where(Task.id == task_id))
     db.commit()
     return {"message": "Task deleted successfully"}
 
@@ -144,24 +157,23 @@ def toggle_task(
     db: Session = Depends(get_db)
 ):
     """Переключить статус задачи (включить/выключить)"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
+    # Переключаем статус между todo и done одним UPDATE ... RETURNING с проверкой доступа
+    is_done = Task.status == "done"
+    task = db.execute(
+        update(Task).where(
+            Task.id == task_id,
+            Task.workspace_id == workspace_id,
+            task_access_condition(current_user)
+        ).values(
+            status=case((is_done, "todo"), else_="done"),
+            completed_at=case((is_done, None), else_=datetime.utcnow())
+        ).returning(Task)
+    ).scalar_one_or_none()
+    if task is None:
+        # Ничего не обновлено: определяем причину (404, 400 или 403)
+        get_task_with_access(task_id, current_user, db, workspace_id=workspace_id)
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task.workspace_id != workspace_id:
-        raise HTTPException(status_code=400, detail="Task does not belong to this workspace")
-    
-    # Проверяем доступ
-    check_workspace_access(workspace_id, current_user, db)
-    
-    # Переключаем статус между todo и done
-    if task.status == "done":
-        task.status = "todo"
-        task.completed_at = None
-    else:
-        task.status = "done"
-        task.completed_at = datetime.utcnow()
-    
     db.commit()
     db.refresh(task)
     return task
@@ -174,27 +186,28 @@ def set_task_assignees(
     db: Session = Depends(get_db)
 ):
     """Установить исполнителей задачи"""
-    task = db.query(Task).filter(Task.id == task_id).first()
-    if not task:
-        raise HTTPException(status_code=404, detail="Task not found")
-    
-    # Проверяем доступ к рабочему пространству
-    workspace = check_workspace_access(task.workspace_id, current_user, db)
+    task, workspace = get_task_with_access(task_id, current_user, db)
     
     # Очищаем текущих исполнителей
     task.assignees.clear()
     
-    # Добавляем новых исполнителей
-    for user_id in assignees_data.assignees_ids:
-        user = db.query(User).filter(User.id == user_id).first()
-        if user:
-            # Проверяем, является ли пользователь участником рабочего пространства
-            membership = db.query(WorkspaceMember).filter(
-                WorkspaceMember.workspace_id == task.workspace_id,
-                WorkspaceMember.user_id == user_id
-            ).first()
-            if membership or workspace.owner_id == user_id:
-                task.assignees.append(user)
+    # Загружаем всех пользователей и их участие в рабочем пространстве двумя запросами
+    user_ids = list(dict.fromkeys(assignees_data.assignees_ids))
+    users = {
+        user.id: user
+        for user in db.query(User).filter(User.id.in_(user_ids)).all()
+    }
+    member_ids = {
+        user_id for (user_id,) in db.query(WorkspaceMember.user_id).filter(
+            WorkspaceMember.workspace_id == task.workspace_id,
+            WorkspaceMember.user_id.in_(user_ids)
+        ).all()
+    }
+    
+    # Добавляем новых исполнителей: участников рабочего пространства или владельца
+    for user_id in user_ids:
+        if user_id in users and (user_id in member_ids or workspace.owner_id == user_id):
+            task.assignees.append(users[user_id])
     
     db.commit()
     db.refresh(task)
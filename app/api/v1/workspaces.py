@@ -1,15 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import or_, select
 from typing import List
 
 from app.database.database import get_db
 from app.models.user import User
 from app.models.workspace import Workspace, WorkspaceMember
+from app.models.enums import Role
 from app.schemas.workspace import (
     WorkspaceCreate, WorkspaceUpdate, WorkspaceResponse,
-    WorkspaceUser, WorkspaceMemberResponse, InviteUserRequest
+    WorkspaceUser, WorkspaceMemberResponse, InviteUserRequest, MemberRoleUpdate
 )
 from app.core.security import get_current_active_user
+from app.core.access import check_workspace_access
+from app.core.cache import workspace_access_cache, workspace_members_cache
 
 router = APIRouter()
 
@@ -19,16 +23,15 @@ def get_workspaces(
     db: Session = Depends(get_db)
 ):
     """Получить список рабочих пространств пользователя"""
-    # Получаем рабочие пространства, где пользователь является владельцем или участником
-    owned_workspaces = db.query(Workspace).filter(Workspace.owner_id == current_user.id).all()
-    
-    member_workspaces = db.query(Workspace).join(WorkspaceMember).filter(
+    # Получаем рабочие пространства, где пользователь является владельцем или участником,
+    # одним запросом: IN по подзапросу не дает дубликатов, DISTINCT не нужен
+    member_workspace_ids = select(WorkspaceMember.workspace_id).where(
         WorkspaceMember.user_id == current_user.id
+    )
+    workspaces = db.query(Workspace).filter(
+        or_(Workspace.owner_id == current_user.id, Workspace.id.in_(member_workspace_ids))
     ).all()
-    
-    # Объединяем и удаляем дубликаты
-    all_workspaces = list({w.id: w for w in owned_workspaces + member_workspaces}.values())
-    return all_workspaces
+    return workspaces
 
 @router.get("/{workspace_id}", response_model=WorkspaceResponse)
 def get_workspace(
@@ -37,18 +40,8 @@ def get_workspace(
     db: Session = Depends(get_db)
 ):
     """Получить конкретное рабочее пространство"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-    
     # Проверяем, имеет ли пользователь доступ к рабочему пространству
-    if workspace.owner_id != current_user.id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == current_user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied")
+    workspace = check_workspace_access(workspace_id, current_user, db, detail="Access denied")
     
     return workspace
 
@@ -66,17 +59,18 @@ def create_workspace(
     )
     
     db.add(workspace)
-    db.commit()
-    db.refresh(workspace)
+    # flush выдает id без коммита: рабочее пространство и участник сохраняются одной транзакцией
+    db.flush()
     
     # Добавляем владельца как участника с ролью owner
     member = WorkspaceMember(
         workspace_id=workspace.id,
         user_id=current_user.id,
-        role="owner"
+        role=Role.owner
     )
     db.add(member)
     db.commit()
+    db.refresh(workspace)
     
     return workspace
 
@@ -96,7 +90,7 @@ def update_workspace(
     if workspace.owner_id != current_user.id:
         raise HTTPException(status_code=403, detail="Only owner can update workspace")
     
-    for field, value in workspace_data.dict(exclude_unset=True).items():
+    for field, value in workspace_data.model_dump(exclude_unset=True).items():
         setattr(workspace, field, value)
     
     db.commit()
@@ -120,45 +114,53 @@ def delete_workspace(
     
     db.delete(workspace)
     db.commit()
+    workspace_access_cache.pop_where(lambda key: key[0] == workspace_id)
+    workspace_members_cache.pop_where(lambda key: key[0] == workspace_id)
     return {"message": "Workspace deleted successfully"}
 
 @router.get("/{workspace_id}/members", response_model=List[WorkspaceUser])
 def get_workspace_members(
     workspace_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Получить участников рабочего пространства"""
-    workspace = db.query(Workspace).filter(Workspace.id == workspace_id).first()
-    if not workspace:
-        raise HTTPException(status_code=404, detail="Workspace not found")
-    
     # Проверяем доступ
-    if workspace.owner_id != current_user.id:
-        membership = db.query(WorkspaceMember).filter(
-            WorkspaceMember.workspace_id == workspace_id,
-            WorkspaceMember.user_id == current_user.id
-        ).first()
-        if not membership:
-            raise HTTPException(status_code=403, detail="Access denied")
-    
-    members = db.query(WorkspaceMember).filter(
-        WorkspaceMember.workspace_id == workspace_id
+    workspace = check_workspace_access(workspace_id, current_user, db, detail="Access denied")
+    
+    # Список участников меняется редко: отдаем из кэша, доступ проверяется всегда
+    cache_key = (workspace_id, limit, offset)
+    cached = workspace_members_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # Участники вместе с данными пользователей одним запросом, только нужные колонки
+    members = db.execute(
+        select(
+            User.id, User.name, User.email, WorkspaceMember.role,
+            WorkspaceMember.joined_at, User.avatar, User.position
+        ).join(
+            User, User.id == WorkspaceMember.user_id
+        ).where(
+            WorkspaceMember.workspace_id == workspace_id
+        ).order_by(WorkspaceMember.id).offset(offset).limit(limit)
     ).all()
     
     result = []
     for member in members:
-        user = member.user
         result.append(WorkspaceUser(
-            id=user.id,
-            name=user.name or "",
-            email=user.email,
+            id=member.id,
+            name=member.name or "",
+            email=member.email,
             role=member.role,
             joined_at=member.joined_at,
-            avatar=user.avatar,
-            position=user.position
+            avatar=member.avatar,
+            position=member.position
         ))
     
+    workspace_members_cache.set(cache_key, result)
     return result
 
 @router.post("/{workspace_id}/email-invites")
@@ -185,7 +187,7 @@ def invite_user(
 def change_user_role(
     workspace_id: int,
     user_id: int,
-    role_data: dict,
+    role_data: MemberRoleUpdate,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -207,11 +209,13 @@ def change_user_role(
         raise HTTPException(status_code=404, detail="User not found in workspace")
     
     # Нельзя изменить роль владельца
-    if membership.role == "owner":
+    if membership.role == Role.owner:
         raise HTTPException(status_code=403, detail="Cannot change owner role")
     
-    membership.role = role_data.get("role", membership.role)
+    if role_data.role is not None:
+        membership.role = role_data.role
     db.commit()
+    workspace_members_cache.pop_where(lambda key: key[0] == workspace_id)
     
     return {"message": "User role updated successfully"}
 
@@ -240,10 +244,12 @@ def remove_user(
         raise HTTPException(status_code=404, detail="User not found in workspace")
     
     # Нельзя удалить владельца
-    if membership.role == "owner":
+    if membership.role == Role.owner:
         raise HTTPException(status_code=403, detail="Cannot remove owner")
     
     db.delete(membership)
     db.commit()
+    workspace_access_cache.pop((workspace_id, user_id))
+    workspace_members_cache.pop_where(lambda key: key[0] == workspace_id)
     
     return {"message": "User removed from workspace successfully"}
@@ -0,0 +1,59 @@
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.workspace import Workspace, WorkspaceMember
+from app.models.task import Task
+
+def has_workspace_access(user: User):
+    """Условие: пользователь - владелец или участник рабочего пространства (коррелирует с Workspace)"""
+    return or_(
+        Workspace.owner_id == user.id,
+        exists().where(
+            WorkspaceMember.workspace_id == Workspace.id,
+            WorkspaceMember.user_id == user.id
+        )
+    )
+
+def task_access_condition(user: User):
+    """Условие для WHERE: пользователь имеет доступ к рабочему пространству задачи"""
+    return exists().where(Workspace.id == Task.workspace_id, has_workspace_access(user))
+
+def check_workspace_access(
+    workspace_id: int, user: User, db: Session, detail: str = "Access denied to workspace"
+) -> Workspace:
+    """Проверяет доступ пользователя к рабочему пространству одним запросом"""
+    row = db.query(Workspace, has_workspace_access(user)).filter(
+        Workspace.id == workspace_id
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+
+    workspace, has_access = row
+    if not has_access:
+        raise HTTPException(status_code=403, detail=detail)
+
+    return workspace
+
+def get_task_with_access(
+    task_id: int, user: User, db: Session,
+    workspace_id: Optional[int] = None, detail: str = "Access denied to workspace"
+) -> Tuple[Task, Workspace]:
+    """Загружает задачу, ее рабочее пространство и проверяет доступ одним запросом"""
+    row = db.query(Task, Workspace, has_workspace_access(user)).outerjoin(
+        Workspace, Workspace.id == Task.workspace_id
+    ).filter(Task.id == task_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    task, workspace, has_access = row
+    if workspace_id is not None and task.workspace_id != workspace_id:
+        raise HTTPException(status_code=400, detail="Task does not belong to this workspace")
+    if workspace is None:
+        raise HTTPException(status_code=404, detail="Workspace not found")
+    if not has_access:
+        raise HTTPException(status_code=403, detail=detail)
+
+    return task, workspace
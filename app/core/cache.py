@@ -0,0 +1,59 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class TTLCache:
+    """Простой in-process кэш с ограничением размера и временем жизни записей"""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[float, Any]] = {}
+        # Кэш используется и из event loop, и из потоков синхронных эндпоинтов
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Получить значение, если запись есть и не устарела"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Сохранить значение на ttl секунд (по умолчанию self.ttl)"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Вытесняем самую старую запись
+                del self._data[next(iter(self._data))]
+            self._data[key] = (expires_at, value)
+
+    def pop(self, key: Hashable):
+        """Удалить запись"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def pop_where(self, predicate: Callable[[Hashable], bool]):
+        """Удалить все записи, ключи которых удовлетворяют условию"""
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+# Подтвержденный доступ к рабочим пространствам: (workspace_id, user_id) -> True.
+# Сбрасывается при удалении участника или рабочего пространства, но только в том воркере,
+# который обработал удаление: в остальных воркерах отозванный доступ действует до ttl.
+# Поэтому ttl короткий - он ограничивает это окно
+workspace_access_cache = TTLCache(maxsize=10_000, ttl=10)
+
+# Проверенные JWT токены: token -> email. Запись живет не дольше срока действия токена
+token_cache = TTLCache(maxsize=4096, ttl=60)
+
+# Списки участников рабочих пространств: (workspace_id, limit, offset) -> список WorkspaceUser.
+# Сбрасывается при изменении состава или ролей только в воркере, обработавшем изменение;
+# в остальных воркерах (и для изменений профилей) список устаревает не дольше чем на ttl
+workspace_members_cache = TTLCache(maxsize=1024, ttl=10)
@@ -0,0 +1,45 @@
+from typing import Dict, List, Optional
+from fastapi import APIRouter
+from starlette.routing import BaseRoute, Match, Route, WebSocketRoute
+
+class ExactRouteRouter(APIRouter):
+    """Роутер, который для путей без параметров ищет маршрут по словарю вместо перебора всех роутов.
+    Для такого пути запоминаются все роуты, совпадающие с ним, в порядке объявления, поэтому
+    объявленный раньше роут с параметрами сохраняет приоритет. Остальные пути, 405 и
+    редиректы по слэшу обрабатывает обычный перебор Router"""
+
+    # Строится при первом запросе, когда все роуты уже подключены
+    _exact_routes: Optional[Dict[str, List[BaseRoute]]] = None
+
+    def build_exact_routes(self) -> Dict[str, List[BaseRoute]]:
+        """Путь без параметров -> роуты, которые могут с ним совпасть, в порядке объявления"""
+        exact_routes: Dict[str, List[BaseRoute]] = {}
+        for route in self.routes:
+            if not isinstance(route, (Route, WebSocketRoute)) or "{" in route.path:
+                continue
+            if route.path in exact_routes:
+                continue
+            candidates: List[BaseRoute] = []
+            for other in self.routes:
+                path_regex = getattr(other, "path_regex", None)
+                if path_regex is None:
+                    # Роут без регулярного выражения (например Host) - путь остается на переборе
+                    break
+                if path_regex.match(route.path):
+                    candidates.append(other)
+            else:
+                exact_routes[route.path] = candidates
+        return exact_routes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            if self._exact_routes is None:
+                self._exact_routes = self.build_exact_routes()
+            for route in self._exact_routes.get(scope["path"], ()):
+                match, child_scope = route.matches(scope)
+                if match == Match.FULL:
+                    scope.setdefault("router", self)
+                    scope.update(child_scope)
+                    await route.handle(scope, receive, send)
+                    return
+        await super().__call__(scope, receive, send)
@@ -1,5 +1,7 @@
+import asyncio
+import time
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
@@ -7,14 +9,23 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 from app.models.user import User
+from app.core.cache import token_cache
 
 # Конфигурация
 SECRET_KEY = "your-secret-key-here"  # В продакшене использовать переменные окружения
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# Хеширование паролей
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Хеширование паролей. bcrypt_sha256 предварительно хеширует пароль SHA-256
+# (у bcrypt ограничение 72 байта). Старые хеши bcrypt проверяются и
+# перехешируются при входе
+BCRYPT_ROUNDS = 12
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt"],
+    deprecated="auto",
+    bcrypt_sha256__rounds=BCRYPT_ROUNDS,
+    bcrypt__rounds=BCRYPT_ROUNDS
+)
 
 # OAuth2 схема
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
@@ -23,6 +34,10 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверяет пароль"""
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Проверяет пароль и возвращает новый хеш, если старый нужно обновить"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """Хеширует пароль"""
     return pwd_context.hash(password)
@@ -41,14 +56,31 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
 
 def verify_token(token: str) -> Optional[str]:
     """Проверяет JWT токен и возвращает email"""
+    # Уже проверенный токен не декодируем повторно
+    email = token_cache.get(token)
+    if email is not None:
+        return email
+    
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
         if email is None:
             return None
-        return email
     except JWTError:
         return None
+    
+    # Кэшируем не дольше срока действия токена
+    ttl = min(token_cache.ttl, payload["exp"] - time.time()) if "exp" in payload else token_cache.ttl
+    if ttl > 0:
+        token_cache.set(token, email, ttl=ttl)
+    return email
+
+async def verify_token_async(token: str) -> Optional[str]:
+    """Проверяет JWT токен, не блокируя event loop (для WebSocket)"""
+    email = token_cache.get(token)
+    if email is not None:
+        return email
+    return await asyncio.to_thread(verify_token, token)
 
 def get_current_user(
     token: str = Depends(oauth2_scheme),
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
@@ -10,16 +10,49 @@ SQLALCHEMY_DATABASE_URL = os.getenv(
     "sqlite:///./nexttask.db"
 )
 
+# Размер пула потоков для синхронных эндпоинтов (устанавливается в main.py)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+# Пул соединений ограничен сверху независимо от THREADPOOL_SIZE: на воркер не больше
+# DB_POOL_SIZE + DB_MAX_OVERFLOW соединений (для PostgreSQL это число, умноженное на
+# число воркеров, не должно превышать max_connections). Потоки сверх этого ждут
+# свободного соединения до DB_POOL_TIMEOUT секунд, затем запрос завершается ошибкой
+DB_POOL_SIZE = 20
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "40"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+
 # Создаем движок базы данных
 if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # База в памяти существует только в рамках одного соединения, поэтому для нее
+    # одно общее соединение (StaticPool). Для файла каждый поток получает свое соединение
+    in_memory = SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:")
+    pool_args = (
+        {"poolclass": StaticPool} if in_memory
+        else {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+    )
     engine = create_engine(
         SQLALCHEMY_DATABASE_URL, 
         connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
-        echo=False  # Отключаем логирование SQL запросов
+        echo=False,  # Отключаем логирование SQL запросов
+        **pool_args
     )
+    
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragma(dbapi_connection, connection_record):
+        # WAL: чтение не блокируется записью, NORMAL: меньше fsync при коммите
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
 else:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_pre_ping=True,  # Проверяем соединение перед выдачей из пула
+        pool_recycle=1800  # Пересоздаем соединения старше 30 минут
+    )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,6 +60,9 @@ Base = declarative_base()
 
 # Зависимость для получения сессии БД
 def get_db():
+    """Сессия на время запроса. Закрывается в finally при любом исходе,
+    соединение сразу возвращается в пул. WebSocket обработчики не используют
+    get_db и открывают короткие сессии через `with SessionLocal() as db`"""
     db = SessionLocal()
     try:
         yield db
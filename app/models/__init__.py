@@ -1,3 +1,4 @@
+from .enums import Role, InviteStatus
 from .user import User
 from .workspace import Workspace, WorkspaceMember
 from .task import Task, task_assignees
@@ -6,6 +7,8 @@ from .invite import Invite, EmailInvite
 from .message import Message, WorkspaceMessage
 
 __all__ = [
+    "Role",
+    "InviteStatus",
     "User",
     "Workspace", 
     "WorkspaceMember",
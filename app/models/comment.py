@@ -1,18 +1,27 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
+from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
+from app.models.triggers import updated_at_trigger
 
 class Comment(Base):
     __tablename__ = "comments"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
     task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False)
     author_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_onupdate=FetchedValue())  # выставляет триггер БД
+
+    __table_args__ = (
+        # Комментарии задачи, отсортированные по времени создания
+        Index("ix_comments_task", task_id, created_at),
+    )
 
     # Связи
     task = relationship("Task", back_populates="comments")
     author = relationship("User", back_populates="comments")
+
+updated_at_trigger(Comment.__table__)
@@ -0,0 +1,14 @@
+import enum
+
+class Role(str, enum.Enum):
+    """Роль участника рабочего пространства"""
+    owner = "owner"
+    editor = "editor"
+    reader = "reader"
+
+class InviteStatus(str, enum.Enum):
+    """Статус приглашения"""
+    pending = "pending"
+    accepted = "accepted"
+    declined = "declined"
+    expired = "expired"
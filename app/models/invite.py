@@ -1,23 +1,29 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Text, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
+from app.models.enums import Role, InviteStatus
 
 class Invite(Base):
     __tablename__ = "invites"
 
-    id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True, nullable=False)
+    id = Column(Integer, primary_key=True)
+    token = Column(String(43), unique=True, index=True, nullable=False)  # secrets.token_urlsafe(32)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
     inviter_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     invitee_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Может быть null для email-приглашений
     email = Column(String, nullable=True)  # Email для приглашений незарегистрированных пользователей
-    role = Column(String, nullable=False)  # "owner", "editor", "reader"
-    status = Column(String, default="pending")  # "pending", "accepted", "declined", "expired"
+    role = Column(SQLEnum(Role, name="workspace_role", create_constraint=True), nullable=False)
+    status = Column(SQLEnum(InviteStatus, name="invite_status", create_constraint=True), default=InviteStatus.pending)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     accepted_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Приглашения рабочего пространства
+        Index("ix_invites_workspace", workspace_id),
+    )
+
     # Связи
     workspace = relationship("Workspace", back_populates="invites")
     inviter = relationship("User", foreign_keys=[inviter_id], back_populates="sent_invites")
@@ -26,16 +32,22 @@ class Invite(Base):
 class EmailInvite(Base):
     __tablename__ = "email_invites"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
     email = Column(String, nullable=False)
-    role = Column(String, nullable=False)  # "owner", "editor", "reader"
-    status = Column(String, default="pending")  # "pending", "accepted", "declined"
-    token = Column(String, unique=True, index=True, nullable=False)
+    role = Column(SQLEnum(Role, name="workspace_role", create_constraint=True), nullable=False)
+    status = Column(SQLEnum(InviteStatus, name="invite_status", create_constraint=True), default=InviteStatus.pending)
+    token = Column(String(43), unique=True, index=True, nullable=False)  # secrets.token_urlsafe(32)
     expires_at = Column(DateTime(timezone=True), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     sent_at = Column(DateTime(timezone=True), nullable=True)
     accepted_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Входящие приглашения пользователя и приглашения рабочего пространства
+        Index("ix_email_invites_email", email),
+        Index("ix_email_invites_workspace", workspace_id),
+    )
+
     # Связи
     workspace = relationship("Workspace")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Index, text
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
@@ -6,14 +6,27 @@ from app.database.database import Base
 class Message(Base):
     __tablename__ = "messages"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     receiver_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    is_read = Column(Boolean, default=False)
+    is_read = Column(Boolean, default=False, server_default=text("false"))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     read_at = Column(DateTime(timezone=True), nullable=True)
 
+    __table_args__ = (
+        # Частичный индекс только по непрочитанным сообщениям для счетчика непрочитанных
+        Index(
+            "messages_unread_idx",
+            receiver_id,
+            postgresql_where=is_read.is_(False),
+            sqlite_where=is_read.is_(False)
+        ),
+        # История переписки и список недавних чатов (поиск по отправителю и по получателю)
+        Index("ix_messages_sender_receiver", sender_id, receiver_id, created_at),
+        Index("ix_messages_receiver_sender", receiver_id, sender_id, created_at),
+    )
+
     # Связи
     sender = relationship("User", foreign_keys=[sender_id], back_populates="sent_messages")
     receiver = relationship("User", foreign_keys=[receiver_id], back_populates="received_messages")
@@ -21,12 +34,17 @@ class Message(Base):
 class WorkspaceMessage(Base):
     __tablename__ = "workspace_messages"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     content = Column(Text, nullable=False)
     workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
     sender_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        # История группового чата и время последнего сообщения
+        Index("ix_workspace_messages_workspace", workspace_id, created_at),
+    )
+
     # Связи
     workspace = relationship("Workspace", back_populates="workspace_messages")
     sender = relationship("User", back_populates="workspace_messages")
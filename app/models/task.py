@@ -1,7 +1,9 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Table
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Boolean, Table, Index
+from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
+from app.models.triggers import updated_at_trigger
 
 # Таблица для связи многие-ко-многим между задачами и исполнителями
 task_assignees = Table(
@@ -14,7 +16,7 @@ task_assignees = Table(
 class Task(Base):
     __tablename__ = "tasks"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     title = Column(String, nullable=False)
     description = Column(Text, nullable=True)
     status = Column(String, default="todo")  # "todo", "in_progress", "done"
@@ -24,10 +26,18 @@ class Task(Base):
     due_date = Column(DateTime(timezone=True), nullable=True)
     completed_at = Column(DateTime(timezone=True), nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_onupdate=FetchedValue())  # выставляет триггер БД
+
+    __table_args__ = (
+        # Задачи рабочего пространства (с сортировкой по id) и задачи, созданные пользователем
+        Index("ix_tasks_workspace_id", workspace_id, id),
+        Index("ix_tasks_creator", creator_id),
+    )
 
     # Связи
     workspace = relationship("Workspace", back_populates="tasks")
     creator = relationship("User", back_populates="created_tasks")
     assignees = relationship("User", secondary=task_assignees, back_populates="assigned_tasks")
     comments = relationship("Comment", back_populates="task", cascade="all, delete-orphan")
+
+updated_at_trigger(Task.__table__)
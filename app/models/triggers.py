@@ -0,0 +1,59 @@
+from typing import List
+from sqlalchemy import Table, inspect, text
+from sqlalchemy.engine import Engine
+
+# Функция для PostgreSQL: updated_at выставляет сама БД при каждом UPDATE
+_PG_FUNCTION = """
+CREATE OR REPLACE FUNCTION set_updated_at() RETURNS trigger AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+_PG_DROP_TRIGGER = "DROP TRIGGER IF EXISTS {table}_set_updated_at ON {table}"
+
+_PG_TRIGGER = """
+CREATE TRIGGER {table}_set_updated_at BEFORE UPDATE ON {table}
+FOR EACH ROW EXECUTE FUNCTION set_updated_at()
+"""
+
+# В SQLite нет BEFORE-триггеров с изменением NEW: обновляем строку после UPDATE,
+# если сам запрос не менял updated_at (условие WHEN исключает рекурсию)
+_SQLITE_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS {table}_set_updated_at AFTER UPDATE ON {table}
+FOR EACH ROW WHEN NEW.updated_at IS OLD.updated_at
+BEGIN
+    UPDATE {table} SET updated_at = CURRENT_TIMESTAMP WHERE id = NEW.id;
+END
+"""
+
+# Таблицы, у которых updated_at выставляет триггер
+_UPDATED_AT_TABLES: List[Table] = []
+
+def updated_at_trigger(table: Table):
+    """Регистрирует таблицу: триггер для нее создается в install_updated_at_triggers"""
+    _UPDATED_AT_TABLES.append(table)
+
+def install_updated_at_triggers(engine: Engine):
+    """Создает триггеры updated_at для существующих таблиц (повторный вызов ничего не ломает).
+    Только для разработки вместе с create_all (AUTO_CREATE_TABLES=1): в продакшене
+    триггеры создает миграция Alembic"""
+    dialect = engine.dialect.name
+    if dialect not in ("postgresql", "sqlite"):
+        print(f"updated_at triggers are not supported for {dialect}, skipping")
+        return
+
+    existing = set(inspect(engine).get_table_names())
+    with engine.begin() as connection:
+        if dialect == "postgresql":
+            connection.execute(text(_PG_FUNCTION))
+        for table in _UPDATED_AT_TABLES:
+            if table.name not in existing:
+                continue
+            if dialect == "postgresql":
+                connection.execute(text(_PG_DROP_TRIGGER.format(table=table.name)))
+                connection.execute(text(_PG_TRIGGER.format(table=table.name)))
+            else:
+                connection.execute(text(_SQLITE_TRIGGER.format(table=table.name)))
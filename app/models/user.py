@@ -1,12 +1,14 @@
 from sqlalchemy import Column, Integer, String, DateTime, Boolean, Text
+from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.database.database import Base
+from app.models.triggers import updated_at_trigger
 
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     email = Column(String, unique=True, index=True, nullable=False)
     name = Column(String, nullable=True)
     hashed_password = Column(String, nullable=False)
@@ -14,7 +16,7 @@ class User(Base):
     avatar = Column(Text, nullable=True)  # URL или base64
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_onupdate=FetchedValue())  # выставляет триггер БД
 
     # Связи
     owned_workspaces = relationship("Workspace", back_populates="owner", cascade="all, delete-orphan")
@@ -27,3 +29,5 @@ class User(Base):
     comments = relationship("Comment", back_populates="author")
     sent_invites = relationship("Invite", foreign_keys="Invite.inviter_id", back_populates="inviter")
     received_invites = relationship("Invite", foreign_keys="Invite.invitee_id", back_populates="invitee")
+
+updated_at_trigger(User.__table__)
@@ -1,34 +1,55 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional
+from sqlalchemy import String, DateTime, Text, ForeignKey, UniqueConstraint, Index, Enum as SQLEnum
+from sqlalchemy.schema import FetchedValue
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database.database import Base
+from app.models.triggers import updated_at_trigger
+from app.models.enums import Role
+
+if TYPE_CHECKING:
+    from app.models.user import User
+    from app.models.task import Task
+    from app.models.invite import Invite
+    from app.models.message import WorkspaceMessage
 
 class Workspace(Base):
     __tablename__ = "workspaces"
 
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    description = Column(Text, nullable=True)
-    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    description: Mapped[Optional[str]] = mapped_column(Text)
+    owner_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    updated_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_onupdate=FetchedValue())  # выставляет триггер БД
 
     # Связи
-    owner = relationship("User", back_populates="owned_workspaces")
-    members = relationship("WorkspaceMember", back_populates="workspace", cascade="all, delete-orphan")
-    tasks = relationship("Task", back_populates="workspace", cascade="all, delete-orphan")
-    invites = relationship("Invite", back_populates="workspace", cascade="all, delete-orphan")
-    workspace_messages = relationship("WorkspaceMessage", back_populates="workspace", cascade="all, delete-orphan")
+    owner: Mapped["User"] = relationship(back_populates="owned_workspaces")
+    members: Mapped[List["WorkspaceMember"]] = relationship(back_populates="workspace", cascade="all, delete-orphan")
+    tasks: Mapped[List["Task"]] = relationship(back_populates="workspace", cascade="all, delete-orphan")
+    invites: Mapped[List["Invite"]] = relationship(back_populates="workspace", cascade="all, delete-orphan")
+    workspace_messages: Mapped[List["WorkspaceMessage"]] = relationship(back_populates="workspace", cascade="all, delete-orphan")
+
+updated_at_trigger(Workspace.__table__)
 
 class WorkspaceMember(Base):
     __tablename__ = "workspace_members"
 
-    id = Column(Integer, primary_key=True, index=True)
-    workspace_id = Column(Integer, ForeignKey("workspaces.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
-    role = Column(String, nullable=False)  # "owner", "editor", "reader"
-    joined_at = Column(DateTime(timezone=True), server_default=func.now())
+    id: Mapped[int] = mapped_column(primary_key=True)
+    workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id"))
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
+    # В PostgreSQL - тип enum, в SQLite - строка с CHECK ограничением
+    role: Mapped[Role] = mapped_column(SQLEnum(Role, name="workspace_role", create_constraint=True))
+    joined_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Пользователь может состоять в рабочем пространстве только один раз
+        UniqueConstraint("workspace_id", "user_id", name="uq_workspace_members_workspace_user"),
+        # Рабочие пространства пользователя (список, недавние чаты)
+        Index("ix_wm_user_ws", "user_id", "workspace_id"),
+    )
 
     # Связи
-    workspace = relationship("Workspace", back_populates="members")
-    user = relationship("User", back_populates="workspace_memberships")
+    workspace: Mapped["Workspace"] = relationship(back_populates="members")
+    user: Mapped["User"] = relationship(back_populates="workspace_memberships")
@@ -1,16 +1,28 @@
+from .base import BASE_CFG
 from .user import UserCreate, UserUpdate, UserResponse, Token, TokenData
 from .workspace import (
     WorkspaceCreate, WorkspaceUpdate, WorkspaceResponse,
-    WorkspaceUser, WorkspaceMemberResponse, InviteUserRequest
+    WorkspaceUser, WorkspaceMemberResponse, InviteUserRequest, MemberRoleUpdate
 )
-from .task import TaskCreate, TaskUpdate, TaskResponse, TasksResponse, TaskAssigneesRequest
+from .task import TaskCreate, TaskUpdate, TaskResponse, TasksResponse, TaskAssigneesRequest, TASKS_ADAPTER
 from .comment import CommentCreate, CommentUpdate, CommentResponse, CommentsQuery
 from .invite import (
     InviteCreate, InviteResponse, EmailInviteResponse,
-    InviteLinkItem, IncomingInvite
+    InviteLinkItem, IncomingInvite,
+    INVITE_LINKS_ADAPTER, EMAIL_INVITES_ADAPTER
 )
 from .message import (
     MessageCreate, MessageResponse,
-    WorkspaceMessageCreate, WorkspaceMessageResponse,
-    RecentChat
+    WorkspaceMessageCreate, WorkspaceMessageResponse, SenderBrief,
+    RecentChat, MESSAGES_ADAPTER
 )
+
+# Достраиваем схемы, сборка которых была отложена (например, из-за ссылок вперед),
+# чтобы это происходило при импорте, а не на первом запросе под нагрузкой
+from pydantic import BaseModel as _BaseModel
+
+for _model in list(globals().values()):
+    if (isinstance(_model, type) and issubclass(_model, _BaseModel)
+            and _model is not _BaseModel and not _model.__pydantic_complete__):
+        _model.model_rebuild(force=True)
+del _model, _BaseModel
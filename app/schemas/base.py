@@ -0,0 +1,4 @@
+from pydantic import ConfigDict
+
+# Общая конфигурация схем ответа, которые создаются из объектов БД
+BASE_CFG = ConfigDict(from_attributes=True)
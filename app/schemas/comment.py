@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
+from app.schemas.base import BASE_CFG
 from app.schemas.user import UserResponse
 
 class CommentBase(BaseModel):
@@ -20,8 +21,7 @@ class CommentResponse(CommentBase):
     updated_at: Optional[datetime] = None
     author: UserResponse
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class CommentsQuery(BaseModel):
     limit: Optional[int] = 50
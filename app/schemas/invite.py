@@ -1,9 +1,11 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, TypeAdapter
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.base import BASE_CFG
+from app.models.enums import Role, InviteStatus
 
 class InviteBase(BaseModel):
-    role: str
+    role: Role
 
 class InviteCreate(InviteBase):
     workspace_id: int
@@ -17,47 +19,47 @@ class InviteResponse(BaseModel):
     inviter_id: int
     invitee_id: Optional[int] = None
     email: Optional[str] = None
-    role: str
-    status: str
+    role: Role
+    status: InviteStatus
     expires_at: datetime
     created_at: datetime
     accepted_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class EmailInviteResponse(BaseModel):
     id: int
     workspace_id: int
     email: str
-    role: str
-    status: str
+    role: Role
+    status: InviteStatus
     token: str
     expires_at: datetime
     created_at: datetime
     sent_at: Optional[datetime] = None
     accepted_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class InviteLinkItem(BaseModel):
     id: int
     token: str
-    role: str
-    status: str
+    role: Role
+    status: InviteStatus
     expires_at: datetime
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class IncomingInvite(BaseModel):
     id: int
     workspace_name: str
     inviter_name: str
-    role: str
+    role: Role
     created_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
+
+# Адаптеры списков создаются один раз: валидация всего списка в одном вызове pydantic-core
+INVITE_LINKS_ADAPTER = TypeAdapter(List[InviteLinkItem])
+EMAIL_INVITES_ADAPTER = TypeAdapter(List[EmailInviteResponse])
@@ -1,6 +1,7 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import List, Optional
 from datetime import datetime
+from app.schemas.base import BASE_CFG
 
 class MessageBase(BaseModel):
     content: str
@@ -16,8 +17,14 @@ class MessageResponse(MessageBase):
     created_at: datetime
     read_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
+
+# Максимум сообщений в одном запросе: список уходит в IN (...) и не должен
+# упираться в лимит параметров запроса БД
+MAX_READ_BATCH = 500
+
+class MessagesReadRequest(BaseModel):
+    ids: List[int] = Field(..., max_length=MAX_READ_BATCH)
 
 class WorkspaceMessageBase(BaseModel):
     content: str
@@ -25,15 +32,22 @@ class WorkspaceMessageBase(BaseModel):
 class WorkspaceMessageCreate(WorkspaceMessageBase):
     pass
 
+class SenderBrief(BaseModel):
+    id: int
+    name: Optional[str] = None
+    email: Optional[str] = None
+    avatar: Optional[str] = None
+
+    model_config = BASE_CFG
+
 class WorkspaceMessageResponse(WorkspaceMessageBase):
     id: int
     workspace_id: int
     sender_id: int
     created_at: datetime
-    sender: Optional[dict] = None
+    sender: Optional[SenderBrief] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class RecentChat(BaseModel):
     id: str
@@ -43,3 +57,6 @@ class RecentChat(BaseModel):
     name: str
     avatar: Optional[str] = None
     lastActivityAt: Optional[datetime] = None
+
+# Адаптеры списков создаются один раз: валидация всего списка в одном вызове pydantic-core
+MESSAGES_ADAPTER = TypeAdapter(List[MessageResponse])
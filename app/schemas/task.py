@@ -1,6 +1,7 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from typing import Optional, List
 from datetime import datetime
+from app.schemas.base import BASE_CFG
 from app.schemas.user import UserResponse
 
 class TaskBase(BaseModel):
@@ -30,11 +31,13 @@ class TaskResponse(TaskBase):
     assignees: List[UserResponse] = []
     creator: UserResponse
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class TasksResponse(BaseModel):
     tasks: List[TaskResponse]
 
 class TaskAssigneesRequest(BaseModel):
     assignees_ids: List[int]
+
+# Адаптеры списков создаются один раз: валидация всего списка в одном вызове pydantic-core
+TASKS_ADAPTER = TypeAdapter(List[TaskResponse])
@@ -1,14 +1,19 @@
 from pydantic import BaseModel, EmailStr
 from typing import Optional
 from datetime import datetime
+from app.schemas.base import BASE_CFG
 
-class UserBase(BaseModel):
-    email: EmailStr
+class UserReadBase(BaseModel):
+    # Email из БД уже проверен при регистрации, повторная валидация EmailStr не нужна
+    email: str
     name: Optional[str] = None
     position: Optional[str] = None
     avatar: Optional[str] = None
 
-class UserCreate(UserBase):
+class UserWriteBase(UserReadBase):
+    email: EmailStr
+
+class UserCreate(UserWriteBase):
     password: str
 
 class UserUpdate(BaseModel):
@@ -16,14 +21,13 @@ class UserUpdate(BaseModel):
     position: Optional[str] = None
     avatar: Optional[str] = None
 
-class UserResponse(UserBase):
+class UserResponse(UserReadBase):
     id: int
     is_active: bool
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class Token(BaseModel):
     access_token: str
@@ -1,7 +1,13 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from typing import Optional, List
+import re
 from datetime import datetime
+from app.schemas.base import BASE_CFG
 from app.schemas.user import UserResponse
+from app.models.enums import Role
+
+# Простая проверка формата email без email-validator
+EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
 
 class WorkspaceBase(BaseModel):
     name: str
@@ -20,32 +26,39 @@ class WorkspaceResponse(WorkspaceBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class WorkspaceUser(BaseModel):
     id: int
     name: str
     email: str
-    role: str
+    role: Role
     joined_at: datetime
     avatar: Optional[str] = None
     position: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
 
 class WorkspaceMemberResponse(BaseModel):
     id: int
     workspace_id: int
     user_id: int
-    role: str
+    role: Role
     joined_at: datetime
     user: UserResponse
 
-    class Config:
-        from_attributes = True
+    model_config = BASE_CFG
+
+class MemberRoleUpdate(BaseModel):
+    role: Optional[Role] = None
 
 class InviteUserRequest(BaseModel):
     email: str
-    role: Optional[str] = "reader"
+    role: Optional[Role] = Role.reader
+
+    @field_validator("email")
+    @classmethod
+    def validate_email(cls, value: str) -> str:
+        if not EMAIL_RE.match(value):
+            raise ValueError("Invalid email address")
+        return value
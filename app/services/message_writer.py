@@ -0,0 +1,133 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.database.database import SessionLocal
+
+# Максимальный размер пачки и время ожидания новых сообщений перед записью
+BATCH_MAX_SIZE = 50
+BATCH_MAX_DELAY = 0.05
+
+class MessageWriter:
+    """Записывает сообщения чатов пачками: одна транзакция на несколько сообщений"""
+
+    def __init__(self, max_batch_size: int = BATCH_MAX_SIZE, max_delay: float = BATCH_MAX_DELAY):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def write(self, model, values: Dict[str, Any]):
+        """Поставить сообщение в очередь на запись и дождаться строки (id, created_at)"""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._worker.done():
+            # Очередь и фоновая задача привязаны к event loop, создаем их при первом сообщении
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((model, values, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+
+            # Забираем без ожидания все, что уже в очереди (в том числе пришедшее
+            # во время записи предыдущей пачки)
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+
+            # Одиночное сообщение записываем сразу. Ждем до max_delay, только если
+            # пачка уже собирается (сообщения приходят одновременно)
+            deadline = loop.time() + self.max_delay
+            while 1 < len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Запись в БД выполняется в потоке, чтобы не блокировать event loop
+            try:
+                results = await asyncio.to_thread(self._flush, batch)
+            except Exception as e:
+                results = [e] * len(batch)
+
+            for (_, _, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _flush(self, batch: List[Tuple[Any, Dict[str, Any], asyncio.Future]]) -> list:
+        """Записывает пачку в одной транзакции. При ошибке пишет сообщения по одному,
+        чтобы некорректное сообщение не ломало остальные"""
+        with SessionLocal() as db:
+            try:
+                results = self._insert(db, batch)
+                db.commit()
+                return results
+            except Exception:
+                db.rollback()
+                if len(batch) == 1:
+                    raise
+
+        results = []
+        for item in batch:
+            try:
+                results.extend(self._flush([item]))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _insert(self, db: Session, batch) -> list:
+        # Группируем по модели: один INSERT ... RETURNING на каждую таблицу
+        groups: Dict[Any, List[int]] = {}
+        for index, (model, _, _) in enumerate(batch):
+            groups.setdefault(model, []).append(index)
+
+        results: list = [None] * len(batch)
+        for model, indexes in groups.items():
+            values = [batch[index][1] for index in indexes]
+            dialect = db.get_bind().dialect
+            if dialect.insert_executemany_returning:
+                rows = db.execute(
+                    insert(model).returning(model.id, model.created_at, sort_by_parameter_order=True),
+                    values
+                ).all()
+            elif dialect.insert_returning:
+                # RETURNING поддерживается только для одной строки: INSERT на каждое сообщение,
+                # но без повторного SELECT
+                rows = [
+                    db.execute(
+                        insert(model).values(**item).returning(model.id, model.created_at)
+                    ).one()
+                    for item in values
+                ]
+            else:
+                # Диалект не поддерживает RETURNING
+                objects = [model(**item) for item in values]
+                db.add_all(objects)
+                db.flush()
+                for obj in objects:
+                    db.refresh(obj)
+                rows = [(obj.id, obj.created_at) for obj in objects]
+
+            for index, row in zip(indexes, rows):
+                results[index] = row
+        return results
+
+message_writer = MessageWriter()
@@ -1,24 +1,65 @@
-from fastapi import FastAPI, Request
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
+import asyncio
+import gc
+import orjson
 import os
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+from anyio import to_thread
 
 # Загружаем переменные окружения
 load_dotenv()
 
-from app.database.database import engine, Base
+from app.database.database import engine, Base, THREADPOOL_SIZE
+from app.models.triggers import install_updated_at_triggers
+from app.core.routing import ExactRouteRouter
 from app.api.v1 import auth, workspaces, tasks, profile, comments, invites, chat, me
 
-# Создаем таблицы в базе данных
-Base.metadata.create_all(bind=engine)
+# Политика event loop устанавливается при импорте модуля: с reload=True uvicorn
+# запускает сервер в дочернем процессе (spawn), который импортирует этот модуль заново,
+# но не выполняет блок __main__. При запуске через CLI uvicorn импортирует приложение
+# уже после создания loop, поэтому uringcore работает только через `python main.py`
+def setup_event_loop() -> str:
+    """Выбирает event loop для uvicorn. С USE_URINGCORE=1 (Linux 5.11+) используется
+    io_uring loop из uringcore, иначе uvicorn сам выбирает uvloop или asyncio"""
+    if os.getenv("USE_URINGCORE") != "1":
+        return "auto"
+    try:
+        import uringcore
+    except ImportError:
+        print("uringcore is not installed, using default event loop")
+        return "auto"
+    
+    asyncio.set_event_loop_policy(uringcore.EventLoopPolicy())
+    # Политика уже установлена, uvicorn не должен ее переопределять
+    return "none"
+
+EVENT_LOOP = setup_event_loop()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Запуск приложения
     print("🚀 NextTask Server is starting...")
+    # Создание таблиц при запуске только для разработки (AUTO_CREATE_TABLES=1),
+    # в продакшене схема ведется миграциями Alembic
+    if os.getenv("AUTO_CREATE_TABLES") == "1":
+        Base.metadata.create_all(bind=engine)
+        # Триггеры updated_at (в продакшене - миграция alembic/versions/0001)
+        install_updated_at_triggers(engine)
+    # Синхронные эндпоинты (работа с БД) выполняются в пуле потоков,
+    # по умолчанию в нем 40 потоков, что ограничивает число одновременных запросов
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Подписка на сообщения чатов других воркеров (если задан REDIS_URL)
+    await chat.manager.start()
+    # Объекты, созданные при запуске (модели, схемы, роуты), живут все время работы:
+    # переносим их в постоянное поколение, чтобы сборщик мусора не обходил их повторно
+    gc.collect()
+    gc.freeze()
     yield
+    await chat.manager.stop()
     # Остановка приложения
     print("🛑 NextTask Server is shutting down...")
 
@@ -26,17 +67,23 @@ app = FastAPI(
     title="NextTask API",
     description="API для системы управления задачами и рабочими пространствами",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Ответы сериализуются через orjson (быстрее стандартного json)
+    default_response_class=ORJSONResponse
 )
+# Маршруты без параметров в пути ищутся по словарю (см. ExactRouteRouter).
+# Класс меняется до подключения роутов, настройки роутера FastAPI сохраняются
+app.router.__class__ = ExactRouteRouter
 
 # Настройка CORS
 allowed_origins = os.getenv("ALLOWED_ORIGINS", "*")
 if allowed_origins == "*":
-    allow_origins_list = ["*"]
+    allow_origins_list = frozenset({"*"})
 else:
-    allow_origins_list = [origin.strip() for origin in allowed_origins.split(",")]
+    # frozenset: CORSMiddleware проверяет origin через `in`, поиск по множеству O(1)
+    allow_origins_list = frozenset(origin.strip() for origin in allowed_origins.split(","))
 
-print(f"CORS Origins: {allow_origins_list}")
+print(f"CORS Origins: {sorted(allow_origins_list)}")
 
 app.add_middleware(
     CORSMiddleware,
@@ -63,59 +110,74 @@ app.include_router(invites.router, prefix=f"{api_prefix}/invites", tags=["invite
 app.include_router(chat.router, prefix=f"{api_prefix}/chat", tags=["chat"])
 app.include_router(me.router, prefix=f"{api_prefix}/me", tags=["me"])
 
-# Прямые пути без префикса для обратной совместимости
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(workspaces.router, prefix="/workspaces", tags=["workspaces"])
-app.include_router(tasks.router, prefix="/tasks", tags=["tasks"])
-app.include_router(profile.router, prefix="/profile", tags=["profile"])
-app.include_router(comments.router, prefix="/comments", tags=["comments"])
-app.include_router(invites.router, prefix="/invites", tags=["invites"])
-app.include_router(chat.router, prefix="/chat", tags=["chat"])
-app.include_router(me.router, prefix="/me", tags=["me"])
-
-# Дополнительный путь для задач рабочих пространств
-app.include_router(tasks.router, prefix="/workspaces", tags=["workspace-tasks"])
-print("Tasks router included with /workspaces prefix")
+# Дополнительный путь для задач рабочих пространств (/workspaces/workspaces/{id}/tasks)
+app.include_router(tasks.router, prefix=f"{api_prefix}/workspaces", tags=["workspace-tasks"])
+
+# Прямые пути без префикса для обратной совместимости: вместо повторной регистрации
+# роутов (поиск маршрута перебирает их по очереди) переписываем путь на /api/v1/...
+LEGACY_PREFIXES = frozenset({"auth", "workspaces", "tasks", "profile", "comments", "invites", "chat", "me"})
+
+class LegacyPathMiddleware:
+    """ASGI middleware: /auth/... -> /api/v1/auth/... и т.д. для HTTP и WebSocket"""
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] in ("http", "websocket"):
+            path = scope["path"]
+            if path.split("/", 2)[1] in LEGACY_PREFIXES:
+                scope = dict(scope)
+                scope["path"] = api_prefix + path
+                if "raw_path" in scope:
+                    scope["raw_path"] = api_prefix.encode() + scope["raw_path"]
+        await self.app(scope, receive, send)
+
+app.add_middleware(LegacyPathMiddleware)
+
+# Ответы / и /health не меняются: JSON сериализуется один раз при импорте
+_ROOT_JSON = orjson.dumps({
+    "message": "Welcome to NextTask API",
+    "version": "1.0.0",
+    "docs": "/docs",
+    "redoc": "/redoc",
+    "endpoints": {
+        "auth": {
+            "v1": "/api/v1/auth/register",
+            "direct": "/auth/register"
+        },
+        "workspaces": {
+            "v1": "/api/v1/workspaces/",
+            "direct": "/workspaces/"
+        },
+        "tasks": {
+            "v1": "/api/v1/tasks/",
+            "direct": "/tasks/",
+            "workspace_tasks": "/workspaces/{workspace_id}/tasks"
+        },
+        "profile": {
+            "v1": "/api/v1/profile/me",
+            "direct": "/profile/me",
+            "me": "/me/profile"
+        },
+        "invites": {
+            "v1": "/api/v1/invites/",
+            "direct": "/invites/",
+            "me": "/me/invites"
+        }
+    }
+})
+_HEALTH_JSON = orjson.dumps({"status": "healthy", "service": "NextTask API"})
 
 @app.get("/")
-def root():
+async def root():
     """Корневой эндпоинт"""
-    return {
-        "message": "Welcome to NextTask API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "redoc": "/redoc",
-        "endpoints": {
-            "auth": {
-                "v1": "/api/v1/auth/register",
-                "direct": "/auth/register"
-            },
-            "workspaces": {
-                "v1": "/api/v1/workspaces/",
-                "direct": "/workspaces/"
-            },
-            "tasks": {
-                "v1": "/api/v1/tasks/",
-                "direct": "/tasks/",
-                "workspace_tasks": "/workspaces/{workspace_id}/tasks"
-            },
-            "profile": {
-                "v1": "/api/v1/profile/me",
-                "direct": "/profile/me",
-                "me": "/me/profile"
-            },
-            "invites": {
-                "v1": "/api/v1/invites/",
-                "direct": "/invites/",
-                "me": "/me/invites"
-            }
-        }
-    }
+    return Response(content=_ROOT_JSON, media_type="application/json")
 
 @app.get("/health")
-def health_check():
+async def health_check():
     """Проверка здоровья сервера"""
-    return {"status": "healthy", "service": "NextTask API"}
+    return Response(content=_HEALTH_JSON, media_type="application/json")
 
 @app.get("/debug/routes")
 def debug_routes():
@@ -142,5 +204,6 @@ if __name__ == "__main__":
         host="0.0.0.0",
         port=8000,
         reload=True,
-        log_level="info"
+        log_level="info",
+        loop=EVENT_LOOP
     )
@@ -0,0 +1,53 @@
+import unittest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.routing import ExactRouteRouter
+
+def make_app() -> FastAPI:
+    app = FastAPI()
+    app.router.__class__ = ExactRouteRouter
+
+    @app.get("/items/{item_id}")
+    def get_item(item_id: str):
+        return {"route": "param", "item_id": item_id}
+
+    # Объявлен после роута с параметром: /items/special должен уходить в get_item
+    @app.get("/items/special")
+    def get_special():
+        return {"route": "exact"}
+
+    @app.get("/health")
+    def health():
+        return {"route": "health"}
+
+    @app.post("/forbidden")
+    def forbidden():
+        raise HTTPException(status_code=403, detail="nope")
+
+    return app
+
+class ExactRouteRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.app = make_app()
+        self.client = TestClient(self.app)
+
+    def test_exact_path_is_dispatched_from_lookup(self):
+        response = self.client.get("/health")
+        self.assertEqual(response.json(), {"route": "health"})
+        self.assertEqual(self.app.router._exact_routes["/health"][0].path, "/health")
+
+    def test_earlier_parametric_route_keeps_priority(self):
+        response = self.client.get("/items/special")
+        self.assertEqual(response.json(), {"route": "param", "item_id": "special"})
+        candidates = [route.path for route in self.app.router._exact_routes["/items/special"]]
+        self.assertEqual(candidates, ["/items/{item_id}", "/items/special"])
+
+    def test_fallbacks_of_the_regular_router(self):
+        self.assertEqual(self.client.get("/items/1").json()["item_id"], "1")
+        self.assertEqual(self.client.post("/health").status_code, 405)
+        self.assertEqual(self.client.get("/missing").status_code, 404)
+        self.assertEqual(self.client.post("/forbidden").status_code, 403)
+
+if __name__ == "__main__":
+    unittest.main()